@@ -0,0 +1,43 @@
+import numpy as np
+import argparse
+import timeit
+
+from dsp_fiesta.analyze_thd import calculate_thd_batch, calculate_thd_dft
+
+# Constants
+CASES = [(1000, 0.2), (1250, 0.2), (10000, 0.2), (50000, 0.2), (1000, 1.0)]  # (fs, window) pairs
+N_WINDOWS = 500
+
+def make_windows(fs, window, n_windows, drift, noise, rng):
+    """Windows of a 50 Hz signal with 2nd-10th harmonics, frequency drift and noise."""
+    t = np.arange(int(fs * window)) / fs
+    freq = 50 + rng.uniform(-drift, drift, size=(n_windows, 1))
+    windows = 10 * np.sin(2 * np.pi * freq * t + rng.uniform(0, 2 * np.pi, size=(n_windows, 1)))
+    for h in range(2, 11):
+        amp = rng.uniform(0.2, 1, size=(n_windows, 1))
+        windows += amp * np.sin(2 * np.pi * h * freq * t + rng.uniform(0, 2 * np.pi, size=(n_windows, 1)))
+    return windows + rng.normal(scale=noise, size=windows.shape)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the targeted-bin (dft) THD backend against the FFT backend')
+    parser.add_argument('--windows', type=int, default=N_WINDOWS, help=f'Windows per batch (default: {N_WINDOWS})')
+    parser.add_argument('--drift', type=float, default=0.5, help='Maximum fundamental drift in Hz (default: 0.5)')
+    parser.add_argument('--noise', type=float, default=0.1, help='Noise standard deviation (default: 0.1)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions (default: 5)')
+
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    print(f"{'fs (Hz)':>8} {'Window':>7} {'FFT (ms)':>9} {'DFT (ms)':>9} {'Speedup':>8} {'p99 |dTHD|':>11} {'Max |dTHD|':>11}")
+    print(f"{'-'*69}")
+    for fs, window in CASES:
+        windows = make_windows(fs, window, args.windows, args.drift, args.noise, rng)
+        diff = np.abs(calculate_thd_batch(windows, fs)[0] - calculate_thd_dft(windows, fs)[0])
+
+        t_fft = min(timeit.repeat(lambda: calculate_thd_batch(windows, fs), number=1, repeat=args.repeat))
+        t_dft = min(timeit.repeat(lambda: calculate_thd_dft(windows, fs), number=1, repeat=args.repeat))
+        print(f"{fs:>8} {window:>6.1f}s {t_fft * 1e3:>9.2f} {t_dft * 1e3:>9.2f} {t_fft / t_dft:>7.1f}x "
+              f"{np.percentile(diff, 99):>11.2e} {diff.max():>11.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import numpy as np
+import argparse
+import timeit
+import tracemalloc
+
+from dsp_fiesta.fft_analysis import compute_fft
+
+# Constants
+FS = 10000  # Sampling frequency (Hz)
+DURATION = 600  # 10-minute capture (s)
+
+def legacy_compute_fft(signal, fs):
+    """Reference full complex FFT followed by a positive-frequency mask."""
+    n = len(signal)
+    magnitude = np.abs(np.fft.fft(signal))
+    frequencies = np.fft.fftfreq(n, 1/fs)
+    positive_freq_idx = frequencies >= 0
+    frequencies = frequencies[positive_freq_idx]
+    magnitude = magnitude[positive_freq_idx]
+    magnitude = magnitude / n * 2
+    magnitude[0] = magnitude[0] / 2
+    return frequencies, magnitude
+
+def peak_memory(func):
+    """Peak traced allocation in MB while running func once."""
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the rfft spectral core against the legacy full FFT')
+    parser.add_argument('--fs', type=float, default=FS, help=f'Sampling frequency (default: {FS} Hz)')
+    parser.add_argument('--duration', type=float, default=DURATION, help=f'Capture length in seconds (default: {DURATION})')
+    parser.add_argument('--workers', type=int, default=None, help='FFT worker threads for the rfft core')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (default: 3)')
+
+    args = parser.parse_args()
+
+    n = int(args.fs * args.duration)
+    signal = np.random.default_rng(0).normal(size=n)
+    print(f"Signal: {n} samples ({args.duration:.0f} s at {args.fs:.0f} Hz)")
+
+    f_legacy, m_legacy = legacy_compute_fft(signal, args.fs)
+    f_new, m_new = compute_fft(signal, args.fs, workers=args.workers)
+    match = np.array_equal(f_legacy, f_new) and np.allclose(m_legacy, m_new)
+
+    t_legacy = min(timeit.repeat(lambda: legacy_compute_fft(signal, args.fs), number=1, repeat=args.repeat))
+    t_new = min(timeit.repeat(lambda: compute_fft(signal, args.fs, workers=args.workers), number=1, repeat=args.repeat))
+    mem_legacy = peak_memory(lambda: legacy_compute_fft(signal, args.fs))
+    mem_new = peak_memory(lambda: compute_fft(signal, args.fs, workers=args.workers))
+
+    print(f"{'':>10} {'Time (ms)':>10} {'Peak (MB)':>10}")
+    print(f"{'-'*32}")
+    print(f"{'Legacy':>10} {t_legacy * 1e3:>10.1f} {mem_legacy:>10.1f}")
+    print(f"{'rfft':>10} {t_new * 1e3:>10.1f} {mem_new:>10.1f}")
+    print(f"Speedup: {t_legacy / t_new:.2f}x, memory: {mem_new / mem_legacy:.2f}x, spectra match: {match}")
+
+if __name__ == "__main__":
+    main()
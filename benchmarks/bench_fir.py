@@ -0,0 +1,48 @@
+import numpy as np
+import argparse
+import timeit
+from scipy import signal
+
+from dsp_fiesta.apply_filter import StreamingFIR, design_fir, fft_block_size, fir_filter
+
+# Constants
+FS = 50000  # Sampling frequency (Hz)
+DURATION = 60  # Capture length (s)
+CUTOFF = 2500  # Low-pass cutoff (Hz)
+TAPS = [63, 255, 1023]
+CHUNK_SIZE = 100_000  # Samples per streaming chunk
+
+def streaming(taps, data, chunksize):
+    """Causal overlap-add filtering of data fed in fixed-size chunks."""
+    fir = StreamingFIR(taps)
+    out = [fir.process(data[..., start:start + chunksize]) for start in range(0, data.shape[-1], chunksize)]
+    return np.concatenate(out, axis=-1)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark overlap-add FIR filtering against direct convolution')
+    parser.add_argument('--fs', type=float, default=FS, help=f'Sampling frequency (default: {FS} Hz)')
+    parser.add_argument('--duration', type=float, default=DURATION, help=f'Capture length in seconds (default: {DURATION})')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE, help=f'Streaming chunk size (default: {CHUNK_SIZE})')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (default: 3)')
+
+    args = parser.parse_args()
+
+    n = int(args.fs * args.duration)
+    data = np.random.default_rng(0).normal(size=(2, n))
+    print(f"Signal: 2 x {n} samples ({args.duration:.0f} s at {args.fs:.0f} Hz)")
+
+    print(f"{'Taps':>6} {'FFT':>6} {'lfilter (ms)':>13} {'oaconvolve (ms)':>16} {'stream (ms)':>12} {'Speedup':>8} {'Max error':>10}")
+    print(f"{'-'*78}")
+    for numtaps in TAPS:
+        taps = design_fir(CUTOFF, args.fs, numtaps)
+        reference = signal.lfilter(taps, 1.0, data, axis=-1)
+        error = np.abs(streaming(taps, data, args.chunksize) - reference).max()
+
+        t_direct = min(timeit.repeat(lambda: signal.lfilter(taps, 1.0, data, axis=-1), number=1, repeat=args.repeat))
+        t_oa = min(timeit.repeat(lambda: fir_filter(data, taps), number=1, repeat=args.repeat))
+        t_stream = min(timeit.repeat(lambda: streaming(taps, data, args.chunksize), number=1, repeat=args.repeat))
+        print(f"{numtaps:>6} {fft_block_size(numtaps):>6} {t_direct * 1e3:>13.1f} {t_oa * 1e3:>16.1f} "
+              f"{t_stream * 1e3:>12.1f} {t_direct / t_stream:>7.1f}x {error:>10.1e}")
+
+if __name__ == "__main__":
+    main()
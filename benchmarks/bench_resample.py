@@ -0,0 +1,56 @@
+import numpy as np
+import argparse
+import timeit
+from numpy.lib.stride_tricks import sliding_window_view
+
+from dsp_fiesta.analyze_thd import calculate_thd_batch
+from dsp_fiesta.resample import analysis_rate, decimate
+
+# Constants
+RATES = [10000, 25000, 50000]  # Field logger sampling rates (Hz)
+DURATION = 60  # Capture length (s)
+WINDOW = 0.2  # Analysis window (s)
+HOP = 0.05  # Window advance, as in the dashboard refresh (s)
+
+def make_signal(fs, duration):
+    """Distorted 50 Hz current with 3rd/5th harmonics and broadband noise."""
+    t = np.arange(int(fs * duration)) / fs
+    rng = np.random.default_rng(0)
+    return (10 * np.sin(2 * np.pi * 50 * t) + 0.8 * np.sin(2 * np.pi * 150 * t)
+            + 0.5 * np.sin(2 * np.pi * 250 * t) + rng.normal(scale=0.2, size=t.size))
+
+def windowed_thd(signal, fs, window_len, hop):
+    """THD of overlapping windows advancing by hop samples."""
+    return calculate_thd_batch(sliding_window_view(signal, window_len)[::hop], fs)[0]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark windowed THD at full rate vs. the decimated analysis rate')
+    parser.add_argument('--duration', type=float, default=DURATION, help=f'Capture length in seconds (default: {DURATION})')
+    parser.add_argument('--hop', type=float, default=HOP, help=f'Window advance in seconds (default: {HOP})')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (default: 3)')
+
+    args = parser.parse_args()
+
+    print(f"{'fs (Hz)':>8} {'q':>4} {'Full (ms)':>10} {'Decimate (ms)':>14} {'THD (ms)':>9} {'Speedup':>8} {'Max |dTHD|':>11}")
+    print(f"{'-'*70}")
+    for fs in RATES:
+        signal = make_signal(fs, args.duration)
+        window_len = int(WINDOW * fs)
+        q, fs_analysis = analysis_rate(fs, n=window_len)
+        hop = int(args.hop * fs) // q * q
+        decimated = decimate(signal, q)
+        full = lambda: windowed_thd(signal, fs, window_len, hop)
+        reduced = lambda: windowed_thd(decimated, fs_analysis, window_len // q, hop // q)
+
+        # Windows touching the ends see the resampler's zero padding; compare the interior
+        edge = -(-window_len // hop)
+        diff = np.abs(full() - reduced())[edge:-edge]
+
+        t_full = min(timeit.repeat(full, number=1, repeat=args.repeat))
+        t_resample = min(timeit.repeat(lambda: decimate(signal, q), number=1, repeat=args.repeat))
+        t_thd = min(timeit.repeat(reduced, number=1, repeat=args.repeat))
+        print(f"{fs:>8} {q:>4} {t_full * 1e3:>10.1f} {t_resample * 1e3:>14.1f} {t_thd * 1e3:>9.1f} "
+              f"{t_full / (t_resample + t_thd):>7.1f}x {diff.max():>11.2e}")
+
+if __name__ == "__main__":
+    main()
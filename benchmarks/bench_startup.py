@@ -0,0 +1,69 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Constants
+MODULES = {  # CLI module -> heavy dependencies it needs at import time (preloaded in both probes)
+    'dsp_fiesta.cli': [],
+    'dsp_fiesta.analyze_thd': [],
+    'dsp_fiesta.detect_anomaly': [],
+    'dsp_fiesta.feature_extraction': [],
+    'dsp_fiesta.fft_analysis': [],
+    'dsp_fiesta.apply_filter': ['scipy.signal'],
+    'dsp_fiesta.batch_analyze': [],
+    'dsp_fiesta.pipeline': [],
+}
+EAGER = ['matplotlib.pyplot', 'scipy.interpolate', 'scipy.signal']  # Imported at module level before lazy imports
+FORBIDDEN = ['matplotlib']  # Must not be imported by headless analysis
+STARTUP_RATIO = 0.5  # Lazy import time allowed, as a fraction of the eager baseline
+
+PROBE = """
+import json, sys, time
+{preload}
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+def _import_lines(modules):
+    return '\n'.join(f'import {module}' for module in modules)
+
+def measure(imports, preload, repeat):
+    """Median time of importing modules in fresh interpreters after preload, plus forbidden modules loaded."""
+    probe = PROBE.format(preload=_import_lines(preload), imports=_import_lines(imports), forbidden=FORBIDDEN)
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True)
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(run['seconds'] for run in runs), sorted(set().union(*(run['loaded'] for run in runs)))
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that analysis CLIs start quickly and without plotting libraries')
+    parser.add_argument('--ratio', type=float, default=STARTUP_RATIO,
+                        help=f'Maximum import time relative to the eager baseline (default: {STARTUP_RATIO})')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per measurement (default: 5)')
+
+    args = parser.parse_args()
+
+    print(f"{'Module':<28} {'Lazy (ms)':>10} {'Eager (ms)':>11} {'Ratio':>6} {'Loaded':>12} {'Status':>8}")
+    print(f"{'-'*80}")
+    failures = 0
+    for module, required in MODULES.items():
+        lazy, loaded = measure([module], required, args.repeat)
+        eager, _ = measure(EAGER + [module], required, args.repeat)
+        ratio = lazy / eager
+        ok = ratio <= args.ratio and not loaded
+        failures += not ok
+        print(f"{module:<28} {lazy * 1e3:>10.0f} {eager * 1e3:>11.0f} {ratio:>6.2f} "
+              f"{', '.join(loaded) or '-':>12} {'ok' if ok else 'FAIL':>8}")
+
+    if failures:
+        print(f"\n{failures} module(s) over {args.ratio:g}x the eager import time or importing {', '.join(FORBIDDEN)}")
+        sys.exit(1)
+    print(f"\nAll modules within {args.ratio:g}x the eager import time")
+
+if __name__ == "__main__":
+    main()
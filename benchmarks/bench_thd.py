@@ -0,0 +1,102 @@
+import numpy as np
+import argparse
+import timeit
+from scipy.fft import fft, fftfreq
+
+from dsp_fiesta.analyze_thd import calculate_thd
+from dsp_fiesta.spectral import extract_harmonics
+
+# Constants
+FS = 10000  # Sampling frequency (Hz)
+FREQ = 50  # Power frequency (Hz)
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+def legacy_harmonic_search(xf, amplitudes, fs, fundamental_freq=50):
+    """Reference harmonic search with one boolean mask per harmonic."""
+    search_window = 5  # Hz
+    mask_fund = (xf >= fundamental_freq - search_window) & (xf <= fundamental_freq + search_window)
+    indices_fund = np.where(mask_fund)[0]
+    if len(indices_fund) > 0:
+        idx_fund = indices_fund[np.argmax(amplitudes[indices_fund])]
+    else:
+        idx_fund = np.argmin(np.abs(xf - fundamental_freq))
+
+    fund_freq = xf[idx_fund]
+    fund_amp = amplitudes[idx_fund]
+
+    harmonic_amps = []
+    harmonics = []
+    for h in range(2, 11):
+        target_freq = h * fund_freq
+        if target_freq >= fs / 2:
+            continue
+        mask = (xf >= target_freq - search_window) & (xf <= target_freq + search_window)
+        indices = np.where(mask)[0]
+        if len(indices) == 0:
+            continue
+        idx_harm = indices[np.argmax(amplitudes[indices])]
+        harmonic_amps.append(amplitudes[idx_harm]**2)
+        harmonics.append((xf[idx_harm], amplitudes[idx_harm]))
+
+    thd = np.sqrt(sum(harmonic_amps)) / fund_amp * 100
+    return thd, harmonics
+
+def legacy_calculate_thd(signal, fs, fundamental_freq=50):
+    """Reference THD implementation as it was before the vectorized engine."""
+    n = len(signal)
+    yf = fft(signal)
+    xf = fftfreq(n, 1 / fs)[:n//2]
+    amplitudes = 2.0/n * np.abs(yf[0:n//2])
+    thd, harmonics = legacy_harmonic_search(xf, amplitudes, fs, fundamental_freq)
+    return thd, harmonics, (xf, amplitudes)
+
+def harmonic_search(xf, amplitudes, fs, n, fundamental_freq=50):
+    """Vectorized counterpart of legacy_harmonic_search."""
+    idx_fund, _, idx_harm = extract_harmonics(amplitudes, fs, n, fundamental_freq)
+    harm_amps = amplitudes[idx_harm]
+    thd = np.sqrt(np.sum(harm_amps**2)) / amplitudes[idx_fund] * 100
+    return thd, list(zip(xf[idx_harm], harm_amps))
+
+def best_of(func, repeat):
+    """Best wall-clock time of a single call in seconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+def make_signal(n, fs):
+    """Distorted 50 Hz current with 3rd and 5th harmonics plus noise."""
+    rng = np.random.default_rng(0)
+    t = np.arange(n) / fs
+    signal = np.sin(2 * np.pi * FREQ * t)
+    signal += 0.2 * np.sin(2 * np.pi * 3 * FREQ * t)
+    signal += 0.1 * np.sin(2 * np.pi * 5 * FREQ * t)
+    return signal + rng.normal(0, 0.01, n)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark THD calculation against the legacy implementation')
+    parser.add_argument('--fs', type=float, default=FS, help=f'Sampling frequency (default: {FS} Hz)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions per size (default: 5)')
+
+    args = parser.parse_args()
+
+    print(f"{'Samples':>10} {'Search legacy/new (ms)':>24} {'Speedup':>8} "
+          f"{'THD legacy/new (ms)':>22} {'Speedup':>8} {'Match':>6}")
+    print(f"{'-'*84}")
+    for n in SIZES:
+        signal = make_signal(n, args.fs)
+        _, _, (xf, amplitudes) = legacy_calculate_thd(signal, args.fs)
+
+        thd_legacy, harm_legacy, _ = legacy_calculate_thd(signal, args.fs)
+        thd_new, harm_new, _ = calculate_thd(signal, args.fs)
+        match = np.isclose(thd_legacy, thd_new, rtol=1e-12) and harm_legacy == harm_new
+
+        s_legacy = best_of(lambda: legacy_harmonic_search(xf, amplitudes, args.fs), args.repeat)
+        s_new = best_of(lambda: harmonic_search(xf, amplitudes, args.fs, n), args.repeat)
+        t_legacy = best_of(lambda: legacy_calculate_thd(signal, args.fs), args.repeat)
+        t_new = best_of(lambda: calculate_thd(signal, args.fs), args.repeat)
+
+        search = f"{s_legacy * 1e3:.3f}/{s_new * 1e3:.3f}"
+        total = f"{t_legacy * 1e3:.3f}/{t_new * 1e3:.3f}"
+        print(f"{n:>10} {search:>24} {s_legacy / s_new:>7.2f}x "
+              f"{total:>22} {t_legacy / t_new:>7.2f}x {str(match):>6}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""DSP Fiesta: DSP-based power monitoring and anomaly detection.
+
+Submodules are imported on demand (e.g. ``from dsp_fiesta.detect_anomaly
+import extract_features``), so importing the package itself is cheap.
+"""
+
+__version__ = '0.1.0'
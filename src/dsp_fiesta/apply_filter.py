@@ -0,0 +1,777 @@
+import numpy as np
+import pandas as pd
+from scipy import signal
+from scipy.fft import irfft, rfft
+import argparse
+import functools
+import itertools
+import os
+from .capture import EXTENSION, write_capture
+from .ingest import CHUNK_SIZE, iter_blocks, load_signal
+from .signal_data import estimate_sampling_frequency
+
+# Constants
+FS = 1000  # Sampling frequency (Hz)
+TRANSIENT_TOLERANCE = 1e-12  # Residual impulse response treated as fully decayed
+FIR_TAPS = 255  # Default FIR length (odd, so the group delay is a whole number of samples)
+FIR_METHODS = ('window', 'ls')  # FIR design methods (see design_fir)
+MAX_FFT_SIZE = 2 ** 20  # Largest FFT block considered for overlap-add
+
+@functools.lru_cache(maxsize=128)
+def _design_sos(filter_type, cutoff_freq, fs, order):
+    return signal.butter(order, cutoff_freq, btype=filter_type, fs=fs, output='sos')
+
+def design_filter(filter_type, cutoff_freq, fs, order=4):
+    """Design a Butterworth filter as second-order sections, memoized.
+    
+    Designs are cached by (type, cutoff, fs, order), so filtering many
+    files with the same parameters designs the filter only once. fs and
+    cutoff are rounded to 1 uHz for the key so that sampling frequencies
+    estimated from different files still hit the cache. Second-order
+    sections stay numerically stable at high orders, unlike (b, a).
+    
+    Args:
+        filter_type: 'low', 'high', 'bandpass' or 'bandstop'
+        cutoff_freq: Cutoff frequency in Hz, or (low, high) for band filters
+        fs: Sampling frequency in Hz
+        order: Filter order (default: 4)
+        
+    Returns:
+        Array of second-order sections, shape (n_sections, 6)
+    """
+    cutoff_key = tuple(round(float(f), 6) for f in np.atleast_1d(cutoff_freq))
+    if len(cutoff_key) == 1:
+        cutoff_key = cutoff_key[0]
+    # Copy the cached design so callers can never modify it
+    return _design_sos(filter_type, cutoff_key, round(float(fs), 6), int(order)).copy()
+
+def design_lowpass_filter(cutoff_freq, fs, order=4):
+    """Design a Butterworth low-pass filter.
+    
+    Transfer-function form loses precision at high orders; prefer
+    design_lowpass_sos.
+    
+    Args:
+        cutoff_freq: Cutoff frequency in Hz
+        fs: Sampling frequency in Hz
+        order: Filter order (default: 4)
+        
+    Returns:
+        Tuple of (b, a) filter coefficients
+    """
+    nyquist = fs / 2
+    normalized_cutoff = cutoff_freq / nyquist
+    b, a = signal.butter(order, normalized_cutoff, btype='low', analog=False)
+    return b, a
+
+def apply_sos_filter(data, sos):
+    """Apply a zero-phase filter given as second-order sections.
+    
+    Args:
+        data: Input signal array, filtered along its last axis
+        sos: Second-order sections
+        
+    Returns:
+        Filtered signal array
+    """
+    return signal.sosfiltfilt(sos, data, axis=-1)
+
+def apply_filter(data, b, a):
+    """Apply filter to signal data.
+    
+    Args:
+        data: Input signal array
+        b, a: Filter coefficients
+        
+    Returns:
+        Filtered signal array
+    """
+    # Use filtfilt for zero-phase filtering (no phase distortion)
+    filtered = signal.filtfilt(b, a, data)
+    return filtered
+
+def design_lowpass_sos(cutoff_freq, fs, order=4):
+    """Design a Butterworth low-pass filter as second-order sections.
+    
+    Args:
+        cutoff_freq: Cutoff frequency in Hz
+        fs: Sampling frequency in Hz
+        order: Filter order (default: 4)
+        
+    Returns:
+        Array of second-order sections, shape (n_sections, 6)
+    """
+    return design_filter('low', cutoff_freq, fs, order)
+
+def transient_length(sos, tolerance=TRANSIENT_TOLERANCE):
+    """Number of samples after which the filter's impulse response has decayed.
+    
+    Args:
+        sos: Second-order sections
+        tolerance: Residual amplitude treated as decayed (default: 1e-12)
+        
+    Returns:
+        Length in samples
+    """
+    poles = np.concatenate([np.roots(section[3:]) for section in sos])
+    radius = np.max(np.abs(poles))
+    if radius == 0:
+        return len(sos) * 2
+    # Repeated poles decay polynomially slower; double the single-pole estimate
+    return int(np.ceil(2 * np.log(tolerance) / np.log(radius)))
+
+class StreamingFilter:
+    """Causal filter that processes a signal chunk by chunk.
+    
+    Filter state is carried across chunks, so the output is identical to
+    filtering the whole signal at once with sosfilt, while memory stays
+    bounded by the chunk size.
+    """
+    
+    def __init__(self, sos, initial='zeros'):
+        """
+        Args:
+            sos: Second-order sections
+            initial: 'zeros' to start from rest, or 'steady' to start in the
+                steady state of the first sample (avoids a start-up transient)
+        """
+        if initial not in ('zeros', 'steady'):
+            raise ValueError("initial must be 'zeros' or 'steady'")
+        
+        self.sos = sos
+        self.initial = initial
+        self.zi = None
+    
+    def process(self, chunk):
+        """Filter the next chunk along its last axis.
+        
+        Args:
+            chunk: Array of shape (..., n_samples); leading dimensions
+                (e.g. channels) must stay the same between calls
+            
+        Returns:
+            Filtered chunk of the same shape
+        """
+        chunk = np.asarray(chunk)
+        if self.zi is None:
+            # State shape for sosfilt is (n_sections, ..., 2)
+            lead = chunk.shape[:-1]
+            if self.initial == 'steady':
+                zi = signal.sosfilt_zi(self.sos).reshape((len(self.sos),) + (1,) * len(lead) + (2,))
+                self.zi = zi * chunk[..., 0][None, ..., None]
+            else:
+                self.zi = np.zeros((len(self.sos),) + lead + (2,))
+        
+        filtered, self.zi = signal.sosfilt(self.sos, chunk, axis=-1, zi=self.zi)
+        return filtered
+
+def zero_phase_blocks(sos, chunks, pad=None):
+    """Zero-phase filter a stream of chunks block by block.
+    
+    Each block is filtered with sosfiltfilt together with pad samples of
+    context on both sides, and only its core is kept (overlap-save). With
+    a pad longer than the filter transient the result matches filtering the
+    whole signal at once to within numerical precision, using memory
+    bounded by the chunk size plus twice the pad.
+    
+    Args:
+        sos: Second-order sections
+        chunks: Iterable of arrays of shape (..., n_samples)
+        pad: Context length in samples (default: transient_length(sos))
+        
+    Yields:
+        Filtered chunks; output lags the input by up to pad samples and is
+        flushed when the input ends
+    """
+    if pad is None:
+        pad = transient_length(sos)
+    
+    history = None  # Last pad input samples already emitted
+    pending = None  # Input samples not yet emitted
+    for chunk in chunks:
+        chunk = np.asarray(chunk)
+        pending = chunk if pending is None else np.concatenate([pending, chunk], axis=-1)
+        if pending.shape[-1] <= pad:
+            continue
+        
+        core = pending.shape[-1] - pad
+        context = 0 if history is None else history.shape[-1]
+        segment = pending if history is None else np.concatenate([history, pending], axis=-1)
+        yield signal.sosfiltfilt(sos, segment, axis=-1)[..., context:context + core]
+        
+        history = segment[..., max(context + core - pad, 0):context + core]
+        pending = pending[..., core:]
+    
+    if pending is not None and pending.shape[-1] > 0:
+        context = 0 if history is None else history.shape[-1]
+        segment = pending if history is None else np.concatenate([history, pending], axis=-1)
+        yield signal.sosfiltfilt(sos, segment, axis=-1)[..., context:]
+
+@functools.lru_cache(maxsize=128)
+def _design_fir(cutoff_freq, fs, numtaps, method, window, transition_width):
+    if method == 'ls':
+        bands = [0, cutoff_freq - transition_width / 2, cutoff_freq + transition_width / 2, fs / 2]
+        return signal.firls(numtaps, bands, [1, 1, 0, 0], fs=fs)
+    return signal.firwin(numtaps, cutoff_freq, window=window, fs=fs)
+
+def design_fir(cutoff_freq, fs, numtaps=FIR_TAPS, method='window', window='hamming', transition_width=None):
+    """Design a linear-phase FIR low-pass filter, memoized.
+    
+    Args:
+        cutoff_freq: Cutoff frequency in Hz
+        fs: Sampling frequency in Hz
+        numtaps: Filter length, must be odd (default: 255)
+        method: 'window' (firwin) or 'ls' (least-squares, firls)
+        window: Window for the 'window' method (default: hamming)
+        transition_width: Transition band width in Hz for 'ls' (default:
+            4 * fs / numtaps, narrowed so the band stays inside (0, fs / 2))
+        
+    Returns:
+        Array of numtaps filter coefficients
+    """
+    if numtaps % 2 == 0:
+        raise ValueError(f"numtaps must be odd, got {numtaps}")
+    if method not in FIR_METHODS:
+        raise ValueError(f"method must be one of {FIR_METHODS}")
+    if not 0 < cutoff_freq < fs / 2:
+        raise ValueError(f"Cutoff frequency must lie between 0 and Nyquist ({fs / 2:g} Hz), got {cutoff_freq:g} Hz")
+    # Room for half the transition band on either side of the cutoff
+    room = min(cutoff_freq, fs / 2 - cutoff_freq)
+    if transition_width is None:
+        transition_width = min(4 * fs / numtaps, room)
+    elif method == 'ls' and not 0 < transition_width / 2 < room:
+        raise ValueError(f"Transition band of {transition_width:g} Hz around {cutoff_freq:g} Hz does not fit "
+                         f"between 0 and Nyquist ({fs / 2:g} Hz)")
+    
+    taps = _design_fir(round(float(cutoff_freq), 6), round(float(fs), 6), int(numtaps), method,
+                       window, round(float(transition_width), 6))
+    # Copy the cached design so callers can never modify it
+    return taps.copy()
+
+def fft_block_size(numtaps):
+    """Pick the FFT size that minimizes overlap-add cost per output sample.
+    
+    Each block of nfft points yields nfft - numtaps + 1 new samples for
+    roughly nfft * log2(nfft) work. The size is at least 2 * numtaps, so
+    block tails never overlap more than one neighbouring block.
+    
+    Args:
+        numtaps: FIR filter length
+        
+    Returns:
+        FFT size (power of two)
+    """
+    smallest = max(int(np.ceil(np.log2(2 * numtaps))), 1)
+    sizes = 2 ** np.arange(smallest, max(smallest, int(np.log2(MAX_FFT_SIZE))) + 1)
+    cost = sizes * np.log2(sizes) / (sizes - numtaps + 1)
+    return int(sizes[np.argmin(cost)])
+
+def fir_filter(data, taps):
+    """Filter with a linear-phase FIR using FFT overlap-add convolution.
+    
+    The group delay of (numtaps - 1) / 2 samples is removed, so the output
+    is aligned with the input like a zero-phase filter.
+    
+    Args:
+        data: Input signal array, filtered along its last axis
+        taps: Odd-length FIR coefficients
+        
+    Returns:
+        Filtered signal array of the same shape
+    """
+    data = np.asarray(data)
+    taps = np.asarray(taps).reshape((1,) * (data.ndim - 1) + (-1,))
+    delay = (taps.shape[-1] - 1) // 2
+    full = signal.oaconvolve(data, taps, mode='full', axes=-1)
+    return full[..., delay:delay + data.shape[-1]]
+
+class StreamingFIR:
+    """Causal FIR filter using FFT overlap-add on a stream of chunks.
+    
+    Each chunk is cut into blocks that are transformed together in one
+    batched FFT; the convolution tail is carried into the next chunk, so
+    the concatenated output equals convolving the whole signal at once.
+    """
+    
+    def __init__(self, taps, fft_size=None):
+        """
+        Args:
+            taps: FIR coefficients
+            fft_size: FFT block size (default: fft_block_size(len(taps)))
+        """
+        self.taps = np.asarray(taps)
+        self.numtaps = len(self.taps)
+        self.fft_size = fft_size or fft_block_size(self.numtaps)
+        if self.fft_size < 2 * self.numtaps - 2:
+            raise ValueError(f"fft_size must be at least {2 * self.numtaps - 2}")
+        
+        self.block_len = self.fft_size - self.numtaps + 1
+        self.spectrum = rfft(self.taps, self.fft_size)
+        self.tail = None  # Overlap carried into the next chunk
+    
+    def process(self, chunk):
+        """Filter the next chunk along its last axis.
+        
+        Args:
+            chunk: Array of shape (..., n_samples)
+            
+        Returns:
+            Causal filter output for these samples, same shape as chunk
+        """
+        chunk = np.asarray(chunk)
+        n = chunk.shape[-1]
+        lead = chunk.shape[:-1]
+        overlap = self.numtaps - 1
+        if self.tail is None:
+            self.tail = np.zeros(lead + (overlap,))
+        
+        # Zero-pad into whole blocks and convolve all blocks in one FFT
+        n_blocks = -(-n // self.block_len)
+        blocks = np.zeros(lead + (n_blocks * self.block_len,))
+        blocks[..., :n] = chunk
+        blocks = blocks.reshape(lead + (n_blocks, self.block_len))
+        convolved = irfft(rfft(blocks, self.fft_size, axis=-1) * self.spectrum, self.fft_size, axis=-1)
+        
+        # Overlap-add: block heads tile the output, tails spill into the next block
+        out = np.zeros(lead + ((n_blocks + 1) * self.block_len,))
+        out[..., :n_blocks * self.block_len] = convolved[..., :self.block_len].reshape(lead + (-1,))
+        spill = out[..., self.block_len:].reshape(lead + (n_blocks, self.block_len))
+        spill[..., :overlap] += convolved[..., self.block_len:]
+        out[..., :overlap] += self.tail
+        
+        self.tail = out[..., n:n + overlap].copy()
+        return out[..., :n]
+    
+    def flush(self):
+        """Return the remaining convolution tail (numtaps - 1 samples) and reset."""
+        tail = self.tail
+        self.tail = None
+        return tail
+
+def fir_blocks(taps, chunks):
+    """Linear-phase FIR filtering of a chunk stream with the group delay removed.
+    
+    Output is held back by (numtaps - 1) / 2 samples and completed from the
+    convolution tail at the end, so the concatenated result equals
+    fir_filter on the whole signal.
+    
+    Args:
+        taps: Odd-length FIR coefficients
+        chunks: Iterable of arrays of shape (..., n_samples)
+        
+    Yields:
+        Filtered arrays, aligned with the input samples
+    """
+    fir = StreamingFIR(taps)
+    skip = (fir.numtaps - 1) // 2
+    pending = 0  # Input samples not yet emitted
+    for chunk in chunks:
+        out = fir.process(chunk)
+        pending += out.shape[-1]
+        drop = min(skip, out.shape[-1])
+        skip -= drop
+        out = out[..., drop:]
+        pending -= out.shape[-1]
+        if out.shape[-1]:
+            yield out
+    
+    if fir.tail is not None and pending:
+        yield fir.flush()[..., skip:skip + pending]
+
+def filter_channels(data, fs, cutoff_freq=200, order=4, mode='zero-phase', numtaps=FIR_TAPS, out=None,
+                    fir_method='window'):
+    """Filter every row of an (n_channels, n_samples) array in a single pass.
+    
+    Args:
+        data: Array of shape (n_channels, n_samples), filtered along axis -1
+        fs: Sampling frequency in Hz
+        cutoff_freq: Cutoff frequency in Hz (default: 200 Hz)
+        order: Filter order (default: 4)
+        mode: 'zero-phase', 'causal' or 'fir' (see filter_signal)
+        numtaps: FIR length for 'fir' mode (default: 255)
+        out: Optional preallocated array of the same shape to write into
+        fir_method: FIR design method for 'fir' mode, 'window' or 'ls' (see design_fir)
+        
+    Returns:
+        Filtered array (out, if given)
+    """
+    data = np.asarray(data)
+    if mode == 'fir':
+        filtered = fir_filter(data, design_fir(cutoff_freq, fs, numtaps, fir_method))
+    elif mode == 'causal':
+        filtered = StreamingFilter(design_lowpass_sos(cutoff_freq, fs, order)).process(data)
+    else:
+        filtered = apply_sos_filter(data, design_lowpass_sos(cutoff_freq, fs, order))
+    
+    if out is None:
+        return filtered
+    out[...] = filtered
+    return out
+
+def filter_signal(data, cutoff_freq=200, order=4, mode='zero-phase', numtaps=FIR_TAPS, fs=None, channels=None,
+                  fir_method='window'):
+    """Filter multi-channel signals with one filter pass for all channels.
+    
+    Args:
+        data: DataFrame with a 'time' column and signal columns, or an
+            array of shape (n_channels, n_samples)
+        cutoff_freq: Cutoff frequency in Hz (default: 200 Hz)
+        order: Filter order (default: 4)
+        mode: 'zero-phase' (sosfiltfilt), 'causal' (sosfilt, as in streaming)
+            or 'fir' (linear-phase FIR, overlap-add convolution)
+        numtaps: FIR length for 'fir' mode (default: 255)
+        fs: Sampling frequency in Hz (default: estimated from 'time', or
+            1000 Hz for arrays)
+        channels: DataFrame columns to filter (default: all numeric columns but 'time')
+        fir_method: FIR design method for 'fir' mode, 'window' or 'ls' (see design_fir)
+        
+    Returns:
+        For arrays, the filtered (n_channels, n_samples) array. For
+        DataFrames, a new DataFrame with the time, original channel, other
+        (unfiltered) and '<channel>_filtered' columns
+    """
+    if not isinstance(data, pd.DataFrame):
+        data = np.asarray(data)
+        if data.shape[-1] < 2:
+            raise ValueError("Signal must contain at least 2 samples")
+        return filter_channels(data, fs or FS, cutoff_freq, order, mode, numtaps, fir_method=fir_method)
+    
+    df = data
+    if len(df) < 2:
+        raise ValueError("DataFrame must contain at least 2 samples")
+    
+    if fs is None:
+        # Calculate sampling frequency from data
+        fs = estimate_sampling_frequency(df['time'].values, FS)
+    if channels is None:
+        # Labels, flags and other non-numeric columns are carried over unfiltered
+        channels = [col for col in df.select_dtypes('number').columns if col != 'time']
+    others = [col for col in df.columns if col != 'time' and col not in channels]
+    
+    # One preallocated block holds time, the original and the filtered
+    # channels; the DataFrame wraps it without copying
+    n_ch = len(channels)
+    block = np.empty((len(df), 1 + 2 * n_ch))
+    block[:, 0] = df['time'].values
+    block[:, 1:1 + n_ch] = df[channels].values
+    filter_channels(block[:, 1:1 + n_ch].T, fs, cutoff_freq, order, mode, numtaps,
+                    out=block[:, 1 + n_ch:].T, fir_method=fir_method)
+    
+    columns = ['time'] + list(channels) + [f'{col}_filtered' for col in channels]
+    result = pd.DataFrame(block, columns=columns, index=df.index, copy=False)
+    for position, col in enumerate(others, start=1 + n_ch):
+        result.insert(position, col, df[col].values)
+    return result
+
+def filter_file(filepath, output, cutoff_freq=200, order=4, mode='zero-phase', chunksize=CHUNK_SIZE,
+                numtaps=FIR_TAPS, channels=('voltage', 'current'), fir_method='window'):
+    """Filter a capture chunk by chunk and write the result to a CSV file.
+    
+    Memory stays bounded by the chunk size: 'causal' mode carries the
+    sosfilt state across chunks, 'zero-phase' mode uses block-wise
+    overlap-save filtfilt and 'fir' mode uses overlap-add FIR convolution.
+    
+    Args:
+        filepath: Path to CSV or binary capture file
+        output: Path of the CSV file to write
+        cutoff_freq: Cutoff frequency in Hz (default: 200 Hz)
+        order: Filter order (default: 4)
+        mode: 'zero-phase', 'causal' or 'fir' (default: zero-phase)
+        chunksize: Samples read per chunk
+        numtaps: FIR length for 'fir' mode (default: 255)
+        channels: Signal columns to filter (default: voltage, current)
+        fir_method: FIR design method for 'fir' mode, 'window' or 'ls' (see design_fir)
+        
+    Returns:
+        Number of samples written
+    """
+    columns = ['time'] + list(channels)
+    blocks = iter_blocks(filepath, columns=columns, chunksize=chunksize)
+    first = next(blocks, None)
+    if first is None or len(first[0]) < 2:
+        raise ValueError("Capture must contain at least 2 samples")
+    
+    fs = estimate_sampling_frequency(first[0], FS)
+    sos = design_lowpass_sos(cutoff_freq, fs, order)
+    
+    raw = np.empty((len(columns), 0))  # Time and channels not yet written
+    
+    def signals():
+        nonlocal raw
+        for block in itertools.chain([first], blocks):
+            block = np.vstack(block)
+            raw = np.concatenate([raw, block], axis=-1)
+            yield block[1:]
+    
+    if mode == 'fir':
+        filtered_chunks = fir_blocks(design_fir(cutoff_freq, fs, numtaps, fir_method), signals())
+    elif mode == 'causal':
+        causal = StreamingFilter(sos)
+        filtered_chunks = (causal.process(chunk) for chunk in signals())
+    else:
+        filtered_chunks = zero_phase_blocks(sos, signals())
+    
+    n_written = 0
+    for filtered in filtered_chunks:
+        n = filtered.shape[-1]
+        pd.DataFrame(np.vstack([raw[:, :n], filtered]).T,
+                     columns=columns + [f'{col}_filtered' for col in channels]
+                     ).to_csv(output, mode='w' if n_written == 0 else 'a', header=n_written == 0, index=False)
+        raw = raw[:, n:]
+        n_written += n
+    
+    return n_written
+
+def plot_comparison(df, title="Signal Filtering Comparison", save_path=None):
+    """Plot original vs filtered signals.
+    
+    Args:
+        df: DataFrame with original and filtered signals
+        title: Plot title
+        save_path: Optional path to save the plot
+    """
+    # Imported on first plot so headless filtering never loads matplotlib
+    import matplotlib.pyplot as plt
+    
+    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    
+    # Voltage - Before
+    axes[0, 0].plot(df['time'], df['voltage'], 'b-', linewidth=0.5, alpha=0.7)
+    axes[0, 0].set_xlabel('Time (s)')
+    axes[0, 0].set_ylabel('Voltage (V)')
+    axes[0, 0].set_title('Voltage - Before Filtering')
+    axes[0, 0].grid(True, alpha=0.3)
+    
+    # Voltage - After
+    axes[0, 1].plot(df['time'], df['voltage_filtered'], 'b-', linewidth=0.8)
+    axes[0, 1].set_xlabel('Time (s)')
+    axes[0, 1].set_ylabel('Voltage (V)')
+    axes[0, 1].set_title('Voltage - After Filtering')
+    axes[0, 1].grid(True, alpha=0.3)
+    
+    # Current - Before
+    axes[1, 0].plot(df['time'], df['current'], 'r-', linewidth=0.5, alpha=0.7)
+    axes[1, 0].set_xlabel('Time (s)')
+    axes[1, 0].set_ylabel('Current (A)')
+    axes[1, 0].set_title('Current - Before Filtering')
+    axes[1, 0].grid(True, alpha=0.3)
+    
+    # Current - After
+    axes[1, 1].plot(df['time'], df['current_filtered'], 'r-', linewidth=0.8)
+    axes[1, 1].set_xlabel('Time (s)')
+    axes[1, 1].set_ylabel('Current (A)')
+    axes[1, 1].set_title('Current - After Filtering')
+    axes[1, 1].grid(True, alpha=0.3)
+    
+    fig.suptitle(title, fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    
+    if save_path:
+        fig.savefig(save_path, dpi=300, bbox_inches='tight')
+        print(f"Plot saved to: {save_path}")
+    
+    return fig
+
+def plot_overlay(df, title="Signal Filtering - Overlay Comparison", save_path=None):
+    """Plot original and filtered signals overlaid.
+    
+    Args:
+        df: DataFrame with original and filtered signals
+        title: Plot title
+        save_path: Optional path to save the plot
+    """
+    # Imported on first plot so headless filtering never loads matplotlib
+    import matplotlib.pyplot as plt
+    
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
+    
+    # Voltage overlay
+    ax1.plot(df['time'], df['voltage'], 'b-', linewidth=0.5, alpha=0.5, label='Original (Noisy)')
+    ax1.plot(df['time'], df['voltage_filtered'], 'g-', linewidth=1.2, label='Filtered (Clean)')
+    ax1.set_xlabel('Time (s)')
+    ax1.set_ylabel('Voltage (V)')
+    ax1.set_title('Voltage - Before vs After Filtering')
+    ax1.grid(True, alpha=0.3)
+    ax1.legend()
+    
+    # Current overlay
+    ax2.plot(df['time'], df['current'], 'r-', linewidth=0.5, alpha=0.5, label='Original (Noisy)')
+    ax2.plot(df['time'], df['current_filtered'], 'g-', linewidth=1.2, label='Filtered (Clean)')
+    ax2.set_xlabel('Time (s)')
+    ax2.set_ylabel('Current (A)')
+    ax2.set_title('Current - Before vs After Filtering')
+    ax2.grid(True, alpha=0.3)
+    ax2.legend()
+    
+    fig.suptitle(title, fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    
+    if save_path:
+        fig.savefig(save_path, dpi=300, bbox_inches='tight')
+        print(f"Plot saved to: {save_path}")
+    
+    return fig
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Apply digital low-pass filter to electrical signals'
+    )
+    parser.add_argument(
+        'filepath',
+        type=str,
+        help='Path to CSV file containing signal data (time, voltage, current)'
+    )
+    parser.add_argument(
+        '--cutoff',
+        type=float,
+        default=200,
+        help='Cutoff frequency in Hz (default: 200 Hz)'
+    )
+    parser.add_argument(
+        '--order',
+        type=int,
+        default=4,
+        help='Filter order (default: 4)'
+    )
+    parser.add_argument(
+        '--mode',
+        type=str,
+        choices=['zero-phase', 'causal', 'fir'],
+        default='zero-phase',
+        help='Zero-phase (filtfilt), causal streaming (sosfilt) or linear-phase FIR '
+             '(overlap-add) filtering (default: zero-phase)'
+    )
+    parser.add_argument(
+        '--numtaps',
+        type=int,
+        default=FIR_TAPS,
+        help=f'FIR length for --mode fir, must be odd (default: {FIR_TAPS})'
+    )
+    parser.add_argument(
+        '--fir-method',
+        type=str,
+        choices=FIR_METHODS,
+        default='window',
+        help='FIR design for --mode fir: Hamming window (firwin) or least-squares (firls) (default: window)'
+    )
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=None,
+        help='Filter the file chunk by chunk with bounded memory (requires a CSV --output; no plots)'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default=None,
+        help=f'Save filtered data to a CSV file, or a binary capture if it ends in {EXTENSION} '
+             '(e.g., data/normal_load_filtered.csv)'
+    )
+    parser.add_argument(
+        '--channels',
+        type=str,
+        nargs='+',
+        default=['voltage', 'current'],
+        help='Signal columns to filter, e.g. six three-phase channels (default: voltage current)'
+    )
+    parser.add_argument(
+        '--plot',
+        type=str,
+        choices=['comparison', 'overlay', 'both', 'none'],
+        default='both',
+        help='Type of plot to generate, or none for headless runs (default: both)'
+    )
+    parser.add_argument(
+        '--save-plot',
+        type=str,
+        default=None,
+        help='Save plot to file (e.g., output.png)'
+    )
+    parser.add_argument(
+        '--time-range',
+        type=float,
+        nargs=2,
+        metavar=('START', 'END'),
+        help='Time range to plot in seconds (e.g., --time-range 0 2)'
+    )
+    
+    args = parser.parse_args(argv)
+    
+    if args.chunksize:
+        if not args.output or args.output.endswith(EXTENSION):
+            parser.error('--chunksize requires a CSV --output')
+        print(f"Filtering {args.filepath} in chunks of {args.chunksize} samples "
+              f"({args.mode}, cutoff={args.cutoff} Hz, order={args.order})...")
+        n = filter_file(args.filepath, args.output, cutoff_freq=args.cutoff, order=args.order,
+                        mode=args.mode, chunksize=args.chunksize, numtaps=args.numtaps,
+                        channels=args.channels, fir_method=args.fir_method)
+        print(f"Filtered data saved to: {args.output} ({n} samples)")
+        return
+    
+    # Load signal data
+    print(f"Loading signal data from: {args.filepath}")
+    df = load_signal(args.filepath, columns=['time'] + args.channels)
+    print(f"Loaded {len(df)} samples")
+    
+    # Apply filter
+    print(f"Applying low-pass filter (cutoff={args.cutoff} Hz, order={args.order})...")
+    df_filtered = filter_signal(df, cutoff_freq=args.cutoff, order=args.order, mode=args.mode,
+                                numtaps=args.numtaps, channels=args.channels, fir_method=args.fir_method)
+    print("Filtering complete!")
+    
+    # Calculate noise reduction
+    print(f"\nNoise Reduction:")
+    for col in args.channels:
+        noise = np.std(df[col] - df_filtered[f'{col}_filtered'])
+        print(f"  {col.capitalize()} noise std dev: {noise:.4f}")
+    
+    # Save filtered data if requested
+    if args.output:
+        if args.output.endswith(EXTENSION):
+            fs = estimate_sampling_frequency(df['time'].values, FS)
+            channels = {col: df_filtered[col].values for col in df_filtered.columns if col != 'time'}
+            write_capture(args.output, channels, fs=fs, t0=df['time'].iloc[0])
+        else:
+            df_filtered.to_csv(args.output, index=False)
+        print(f"\nFiltered data saved to: {args.output}")
+    
+    if args.plot == 'none':
+        return
+    
+    if not {'voltage', 'current'} <= set(args.channels):
+        print("Plots require the voltage and current channels; skipping")
+        return
+    
+    # Filter time range if specified
+    df_plot = df_filtered
+    if args.time_range:
+        start, end = args.time_range
+        df_plot = df_filtered[(df_filtered['time'] >= start) & (df_filtered['time'] <= end)]
+        print(f"Plotting time range [{start}, {end}] s: {len(df_plot)} samples")
+    
+    # Generate plots
+    if args.plot in ['comparison', 'both']:
+        save_path = args.save_plot if args.plot == 'comparison' else None
+        if args.plot == 'both' and args.save_plot:
+            # Add suffix for comparison plot
+            base, ext = os.path.splitext(args.save_plot)
+            save_path = f"{base}_comparison{ext}"
+        
+        plot_comparison(df_plot, save_path=save_path)
+    
+    if args.plot in ['overlay', 'both']:
+        save_path = args.save_plot if args.plot == 'overlay' else None
+        if args.plot == 'both' and args.save_plot:
+            # Add suffix for overlay plot
+            base, ext = os.path.splitext(args.save_plot)
+            save_path = f"{base}_overlay{ext}"
+        
+        plot_overlay(df_plot, save_path=save_path)
+    
+    # Show plots if not saving
+    if not args.save_plot:
+        import matplotlib.pyplot as plt
+        plt.show()
+
+if __name__ == "__main__":
+    main()
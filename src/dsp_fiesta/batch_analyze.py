@@ -0,0 +1,200 @@
+import argparse
+import csv
+import glob
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from .analyze_thd import THD_BACKENDS
+from .detect_anomaly import detect_anomaly, extract_features
+from .ingest import load_recording
+from .power_quality import FEATURE_NAMES
+
+# Constants
+CHUNKSIZE = 16  # Files handed to a worker process at a time
+PROGRESS_INTERVAL = 1.0  # Seconds between progress updates
+RESULT_COLUMNS = ['file', 'status', 'fs', 'n_samples'] + list(FEATURE_NAMES) + ['anomaly', 'reason', 'error']
+
+def resolve_inputs(patterns=(), manifest=None):
+    """Expand glob patterns and a manifest file into a list of captures.
+
+    Args:
+        patterns: Glob patterns or paths (recursive ** is supported)
+        manifest: Optional text file with one path per line; blank lines
+            and lines starting with # are skipped
+
+    Returns:
+        List of file paths in input order, without duplicates
+    """
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        # Keep literal paths that do not exist, so they are reported as failures
+        paths.extend(matches or [pattern])
+
+    if manifest:
+        with open(manifest) as f:
+            paths.extend(line.strip() for line in f if line.strip() and not line.lstrip().startswith('#'))
+
+    return list(dict.fromkeys(paths))
+
+def _error_row(filepath, exc):
+    """Result row of a file whose analysis failed."""
+    return {'file': filepath, 'status': 'error', 'error': f"{type(exc).__name__}: {exc}"}
+
+def analyze_file(filepath, thd_threshold=5.0, thd_backend='fft', decimate=False):
+    """Run feature extraction and anomaly detection on one capture.
+
+    Never raises: any failure is reported in the returned row, so one bad
+    file cannot stop a batch.
+
+    Args:
+        filepath: Path to CSV or binary capture
+        thd_threshold: THD threshold in percent (default: 5.0)
+        thd_backend: THD backend passed to extract_features (default: 'fft')
+        decimate: Downsample to the harmonic analysis rate first
+
+    Returns:
+        Result row as a dictionary (see RESULT_COLUMNS)
+    """
+    try:
+        recording = load_recording(filepath)
+        if decimate:
+            from .resample import decimate_recording
+            recording = decimate_recording(recording)
+        features = extract_features(recording, recording.fs, thd_backend=thd_backend)
+        is_anomaly, reason = detect_anomaly(features, thd_threshold=thd_threshold)
+    except Exception as exc:
+        return _error_row(filepath, exc)
+
+    row = {'file': filepath, 'status': 'ok', 'fs': recording.fs, 'n_samples': len(recording)}
+    row.update(features)
+    row.update({'anomaly': is_anomaly, 'reason': reason})
+    return row
+
+def _analyze_files(filepaths, **options):
+    """Result rows of several captures, analyzed in one worker task."""
+    return [analyze_file(filepath, **options) for filepath in filepaths]
+
+def analyze_batch(filepaths, workers=None, chunksize=CHUNKSIZE, **options):
+    """Analyze many captures in a pool of worker processes.
+
+    Each worker imports the analysis stack once and then processes files
+    in chunks of `chunksize`, so per-file overhead is only the analysis.
+    Rows are collected as chunks complete and handed out in input order
+    from a reorder buffer, which only holds rows behind unfinished files.
+
+    A worker that dies (crash, out-of-memory kill) breaks the pool. The
+    files of every chunk lost with it are then retried one at a time in a
+    fresh single-worker pool, so only a file that kills its worker again
+    is reported, as an error row like any other failure.
+
+    Args:
+        filepaths: Paths of the captures to analyze
+        workers: Number of worker processes (default: CPU count)
+        chunksize: Files sent to a worker per task (default: 16)
+        **options: Keyword arguments for analyze_file
+
+    Yields:
+        Result rows in input order, as soon as each is available
+    """
+    filepaths = list(filepaths)
+    rows = {}  # Reorder buffer: input index -> row
+    retry = []  # Indices of files lost with a broken pool
+    next_row = 0
+
+    def ready():
+        nonlocal next_row
+        while next_row in rows:
+            yield rows.pop(next_row)
+            next_row += 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for start in range(0, len(filepaths), chunksize):
+            chunk = range(start, min(start + chunksize, len(filepaths)))
+            try:
+                futures[pool.submit(_analyze_files, filepaths[start:chunk.stop], **options)] = chunk
+            except BrokenProcessPool:
+                retry.extend(chunk)
+
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                rows.update(zip(chunk, future.result()))
+            except BrokenProcessPool:
+                retry.extend(chunk)
+            except Exception as exc:
+                rows.update((index, _error_row(filepaths[index], exc)) for index in chunk)
+            yield from ready()
+
+    pool = None
+    try:
+        for index in sorted(retry):
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=1)
+            try:
+                rows[index] = pool.submit(analyze_file, filepaths[index], **options).result()
+            except BrokenProcessPool as exc:
+                rows[index] = _error_row(filepaths[index], exc)
+                pool.shutdown()
+                pool = None
+            except Exception as exc:
+                rows[index] = _error_row(filepaths[index], exc)
+            yield from ready()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Detect anomalies in many captures in parallel')
+    parser.add_argument('patterns', type=str, nargs='*', help='Capture paths or glob patterns (quote them)')
+    parser.add_argument('--manifest', type=str, default=None, help='Text file listing one capture path per line')
+    parser.add_argument('--output', type=str, default=None, help='Result CSV path (default: stdout)')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE,
+                        help=f'Files handed to a worker at a time (default: {CHUNKSIZE})')
+    parser.add_argument('--thd-threshold', type=float, default=5.0, help='THD threshold in percent (default: 5.0)')
+    parser.add_argument('--thd-backend', type=str, choices=THD_BACKENDS, default='fft',
+                        help='THD backend (default: fft)')
+    parser.add_argument('--decimate', action='store_true',
+                        help='Downsample high-rate captures to the harmonic analysis rate first')
+
+    args = parser.parse_args(argv)
+
+    filepaths = resolve_inputs(args.patterns, args.manifest)
+    if not filepaths:
+        parser.error("No input files given (use patterns and/or --manifest)")
+
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    writer = csv.DictWriter(out, fieldnames=RESULT_COLUMNS, restval='', extrasaction='ignore')
+    writer.writeheader()
+
+    counts = {'ok': 0, 'error': 0, 'anomaly': 0}
+    start = last_report = time.perf_counter()
+    try:
+        results = analyze_batch(filepaths, workers=args.workers, chunksize=args.chunksize,
+                                thd_threshold=args.thd_threshold, thd_backend=args.thd_backend,
+                                decimate=args.decimate)
+        for done, row in enumerate(results, 1):
+            writer.writerow(row)
+            counts[row['status']] += 1
+            counts['anomaly'] += bool(row.get('anomaly'))
+
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_INTERVAL or done == len(filepaths):
+                last_report = now
+                out.flush()
+                print(f"\r[{done}/{len(filepaths)}] {counts['ok']} ok, {counts['error']} failed, "
+                      f"{counts['anomaly']} anomalies ({done / (now - start):.1f} files/s)",
+                      end='', file=sys.stderr, flush=True)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(file=sys.stderr)
+
+    if args.output:
+        print(f"Results written to: {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
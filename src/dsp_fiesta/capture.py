@@ -0,0 +1,183 @@
+import numpy as np
+import json
+import os
+import struct
+
+# Constants
+MAGIC = b'DSPCAP01'  # File signature and format version
+EXTENSION = '.dspcap'
+HEADER_ALIGN = 64  # Channel data starts on a 64-byte boundary
+DTYPES = {'float32': '<f4', 'int16': '<i2'}
+
+def is_capture(filepath):
+    """Check whether a file is a binary capture (by its signature)."""
+    if not os.path.isfile(filepath):
+        return False
+    with open(filepath, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def _encode_header(meta, reserve=0):
+    """Serialize metadata and pad it so channel data is aligned.
+
+    Args:
+        meta: Metadata dictionary
+        reserve: Extra bytes of padding kept free for later header updates
+    """
+    body = json.dumps(meta).encode('utf-8')
+    size = len(MAGIC) + 4 + len(body) + reserve
+    padding = -size % HEADER_ALIGN + reserve
+    return MAGIC + struct.pack('<I', len(body) + padding) + body + b' ' * padding
+
+def read_header(filepath):
+    """Read the metadata of a binary capture.
+
+    Args:
+        filepath: Path to capture file
+
+    Returns:
+        Dictionary with fs, t0, channels, dtype, scale, n_samples and the
+        byte offset of the channel data (data_offset)
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"File not found: {filepath}")
+
+    with open(filepath, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a binary capture file: {filepath}")
+        (length,) = struct.unpack('<I', f.read(4))
+        meta = json.loads(f.read(length).decode('utf-8'))
+
+    meta['data_offset'] = len(MAGIC) + 4 + length
+    return meta
+
+def create_capture(filepath, channels, n_samples, fs, t0=0.0, dtype='float32', scale=None, reserve=0):
+    """Create a capture file of a given size and map it for writing.
+
+    Args:
+        filepath: Output path
+        channels: List of channel names
+        n_samples: Number of samples per channel
+        fs: Sampling frequency in Hz
+        t0: Time of the first sample in seconds
+        dtype: Storage dtype, 'float32' or 'int16'
+        scale: Per-channel physical units per stored count (default: 1.0)
+        reserve: Extra header bytes kept free for update_header (default: 0)
+
+    Returns:
+        Writable np.memmap of shape (n_channels, n_samples)
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype must be one of {list(DTYPES)}")
+
+    meta = {
+        'fs': float(fs),
+        't0': float(t0),
+        'channels': list(channels),
+        'dtype': dtype,
+        'scale': [float(s) for s in scale] if scale is not None else [1.0] * len(channels),
+        'n_samples': int(n_samples)
+    }
+    header = _encode_header(meta, reserve)
+
+    with open(filepath, 'wb') as f:
+        f.write(header)
+        f.truncate(len(header) + len(channels) * n_samples * np.dtype(DTYPES[dtype]).itemsize)
+
+    if n_samples == 0:
+        return np.empty((len(channels), 0), dtype=DTYPES[dtype])
+    return np.memmap(filepath, dtype=DTYPES[dtype], mode='r+', offset=len(header),
+                     shape=(len(channels), n_samples))
+
+def update_header(filepath, **fields):
+    """Rewrite header fields of an existing capture in place.
+
+    The new header must fit in the space of the old one, so files that will
+    be updated should be created with a reserve.
+
+    Args:
+        filepath: Path to capture file
+        **fields: Metadata fields to replace (e.g. fs, t0)
+    """
+    meta = read_header(filepath)
+    data_offset = meta.pop('data_offset')
+    meta.update(fields)
+
+    body = json.dumps(meta).encode('utf-8')
+    padding = data_offset - (len(MAGIC) + 4 + len(body))
+    if padding < 0:
+        raise ValueError(f"Updated header does not fit in {data_offset} bytes: {filepath}")
+
+    with open(filepath, 'r+b') as f:
+        f.write(MAGIC + struct.pack('<I', len(body) + padding) + body + b' ' * padding)
+
+def write_capture(filepath, data, fs, t0=0.0, dtype='float32'):
+    """Write channel arrays to a binary capture file.
+
+    For int16 storage each channel is scaled to use the full 16-bit range.
+
+    Args:
+        filepath: Output path
+        data: Mapping of channel name to 1-D array (all the same length)
+        fs: Sampling frequency in Hz
+        t0: Time of the first sample in seconds
+        dtype: Storage dtype, 'float32' or 'int16' (default: float32)
+    """
+    names = list(data)
+    n_samples = len(data[names[0]])
+
+    scale = None
+    if dtype == 'int16':
+        peaks = [np.max(np.abs(data[name])) if n_samples else 0 for name in names]
+        scale = [peak / np.iinfo(np.int16).max if peak > 0 else 1.0 for peak in peaks]
+
+    out = create_capture(filepath, names, n_samples, fs, t0, dtype, scale)
+    for k, name in enumerate(names):
+        values = np.asarray(data[name])
+        if dtype == 'int16':
+            out[k] = np.round(values / scale[k])
+        else:
+            out[k] = values
+    if isinstance(out, np.memmap):
+        out.flush()
+
+def open_capture(filepath):
+    """Memory-map a binary capture for reading.
+
+    Opening is independent of the file size: no sample data is read until
+    the returned arrays are accessed, and slicing them is zero-copy.
+
+    Args:
+        filepath: Path to capture file
+
+    Returns:
+        Tuple of (meta, data) where data is a read-only np.memmap of shape
+        (n_channels, n_samples) holding the stored (unscaled) samples
+    """
+    meta = read_header(filepath)
+    shape = (len(meta['channels']), meta['n_samples'])
+    if meta['n_samples'] == 0:
+        return meta, np.empty(shape, dtype=DTYPES[meta['dtype']])
+
+    data = np.memmap(filepath, dtype=DTYPES[meta['dtype']], mode='r',
+                     offset=meta['data_offset'], shape=shape)
+    return meta, data
+
+def channel_view(meta, data, name, start=0, stop=None):
+    """Samples of one channel in physical units.
+
+    Float captures with unit scale return a zero-copy view; scaled or
+    integer captures are converted only for the requested range.
+
+    Args:
+        meta, data: Result of open_capture
+        name: Channel name
+        start, stop: Sample range (default: whole channel)
+
+    Returns:
+        1-D array of samples
+    """
+    k = meta['channels'].index(name)
+    raw = data[k, start:stop]
+    if meta['dtype'] == 'float32' and meta['scale'][k] == 1.0:
+        return raw
+    return raw * np.float32(meta['scale'][k])
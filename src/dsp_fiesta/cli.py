@@ -0,0 +1,50 @@
+import argparse
+import importlib
+import sys
+from . import __version__
+
+# Constants
+PROG = 'dsp-fiesta'
+COMMANDS = {
+    'generate': ('generate_data', 'Generate synthetic normal-load and illegal-tap datasets'),
+    'convert': ('convert_capture', 'Convert CSV captures to memory-mappable binary captures'),
+    'visualize': ('visualize_signal', 'Plot voltage and current waveforms'),
+    'filter': ('apply_filter', 'Low-pass filter signal channels'),
+    'thd': ('analyze_thd', 'Analyze Total Harmonic Distortion'),
+    'fft': ('fft_analysis', 'Frequency-domain analysis and spectrum plots'),
+    'features': ('feature_extraction', 'RMS and power metrics of a capture'),
+    'detect': ('detect_anomaly', 'Classify a capture or its sliding windows'),
+    'batch': ('batch_analyze', 'Detect anomalies in many captures in parallel'),
+    'dashboard': ('dashboard', 'Real-time monitoring dashboard'),
+    'pipeline': ('pipeline', 'Run several analysis steps on one capture loaded once'),
+}  # Subcommand -> (module, description)
+
+def main(argv=None):
+    """Entry point of the dsp-fiesta command.
+
+    Only the module of the chosen subcommand is imported, so every
+    subcommand starts as fast as running its module directly.
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description='DSP Fiesta power monitoring and anomaly detection',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='commands:\n' + '\n'.join(f'  {name:<12}{description}'
+                                         for name, (_, description) in COMMANDS.items())
+                + f'\n\nRun "{PROG} <command> --help" for the options of a command.'
+    )
+    parser.add_argument('--version', action='version', version=f'{PROG} {__version__}')
+    parser.add_argument('command', choices=COMMANDS, metavar='command', help='Subcommand to run (see below)')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+
+    args = parser.parse_args(argv)
+
+    module = importlib.import_module(f'.{COMMANDS[args.command][0]}', __package__)
+    # Subcommand usage and errors read "dsp-fiesta <command>"
+    sys.argv[0] = f'{PROG} {args.command}'
+    return module.main(args.args)
+
+if __name__ == "__main__":
+    main()
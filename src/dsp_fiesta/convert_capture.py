@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+import argparse
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .capture import EXTENSION, create_capture, read_header, update_header
+from .ingest import SIGNAL_COLUMNS, read_columns, validate_columns
+
+# Constants
+CHUNK_MB = 64  # Target size of each parsed byte range
+SPACING_TOLERANCE = 1e-3  # Allowed relative deviation of the sample spacing
+HEADER_RESERVE = 64  # Header bytes kept free to fill in fs after parsing
+CHANNELS = ['voltage', 'current']
+
+def split_ranges(filepath, chunk_bytes):
+    """Split the data rows of a CSV into byte ranges on line boundaries.
+
+    Args:
+        filepath: Path to CSV file
+        chunk_bytes: Target size of each range in bytes
+
+    Returns:
+        List of (start, stop) byte offsets covering every data row
+    """
+    size = os.path.getsize(filepath)
+    with open(filepath, 'rb') as f:
+        f.readline()  # Skip the header row
+        boundaries = [f.tell()]
+        while boundaries[-1] < size:
+            f.seek(min(boundaries[-1] + chunk_bytes, size))
+            f.readline()
+            boundaries.append(min(f.tell(), size))
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def _read_range(filepath, start, stop):
+    """Raw bytes of a file between two offsets."""
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        return f.read(stop - start)
+
+def count_rows(filepath, start, stop):
+    """Number of data rows in a byte range (the last line may lack a newline)."""
+    data = _read_range(filepath, start, stop)
+    return data.count(b'\n') + (1 if data and not data.endswith(b'\n') else 0)
+
+def parse_range(filepath, start, stop, names, out_path, row_offset, n_rows):
+    """Parse one byte range and write its samples into the output capture.
+
+    Args:
+        filepath: Path to CSV file
+        start, stop: Byte range to parse
+        names: Column names of the CSV
+        out_path: Capture created by create_capture
+        row_offset: Index of the first row of this range in the whole file
+        n_rows: Number of rows counted in this range
+
+    Returns:
+        Tuple of (first time, last time, min spacing, max spacing)
+    """
+    df = pd.read_csv(io.BytesIO(_read_range(filepath, start, stop)), header=None, names=names,
+                     usecols=SIGNAL_COLUMNS, dtype=np.float64)
+    if len(df) != n_rows:
+        raise ValueError(f"Expected {n_rows} rows in bytes {start}-{stop}, parsed {len(df)}")
+
+    # Map only this range of each channel
+    meta = read_header(out_path)
+    itemsize = np.dtype('<f4').itemsize
+    for k, col in enumerate(CHANNELS):
+        offset = meta['data_offset'] + (k * meta['n_samples'] + row_offset) * itemsize
+        out = np.memmap(out_path, dtype='<f4', mode='r+', offset=offset, shape=(n_rows,))
+        out[:] = df[col].values
+        out.flush()
+
+    t = df['time'].values
+    dt = np.diff(t)
+    if len(dt) == 0:
+        return t[0], t[-1], np.inf, -np.inf
+    return t[0], t[-1], dt.min(), dt.max()
+
+def convert(filepath, out_path, workers=None, chunk_mb=CHUNK_MB, tolerance=SPACING_TOLERANCE):
+    """Convert a time,voltage,current CSV into a float32 binary capture.
+
+    Byte ranges of the CSV are counted and parsed in parallel processes,
+    each writing straight into its slice of the memory-mapped output.
+
+    Args:
+        filepath: Path to CSV file
+        out_path: Path of the capture to write
+        workers: Number of worker processes (default: CPU count)
+        chunk_mb: Target size of each parsed byte range in MB (default: 64)
+        tolerance: Allowed relative deviation of the sample spacing (default: 1e-3)
+
+    Returns:
+        Dictionary with n_samples, fs and t0 of the written capture
+    """
+    validate_columns(filepath, SIGNAL_COLUMNS)
+    names = read_columns(filepath)
+    ranges = split_ranges(filepath, int(chunk_mb * 1e6))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        counts = list(pool.map(count_rows, *zip(*[(filepath, a, b) for a, b in ranges])))
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(int)
+        n_samples = int(sum(counts))
+        if n_samples < 2:
+            raise ValueError(f"CSV must contain at least 2 samples, found {n_samples}")
+
+        # fs is only known after parsing; reserve header space to fill it in
+        create_capture(out_path, CHANNELS, n_samples, fs=0.0, reserve=HEADER_RESERVE)
+        jobs = [(filepath, a, b, names, out_path, int(row), n)
+                for (a, b), row, n in zip(ranges, offsets, counts) if n > 0]
+        try:
+            stats = list(pool.map(parse_range, *zip(*jobs)))
+        except Exception:
+            os.remove(out_path)
+            raise
+
+    firsts, lasts, dt_min, dt_max = (np.array(col) for col in zip(*stats))
+    # Include the spacing across range boundaries
+    gaps = firsts[1:] - lasts[:-1]
+    dt_min = min(dt_min.min(), gaps.min(initial=np.inf))
+    dt_max = max(dt_max.max(), gaps.max(initial=-np.inf))
+
+    dt = (lasts[-1] - firsts[0]) / (n_samples - 1)
+    if dt <= 0 or (dt_max - dt_min) > tolerance * dt:
+        os.remove(out_path)
+        raise ValueError(f"Non-uniform sample spacing: dt ranges from {dt_min:.6g} to {dt_max:.6g} s")
+
+    fs = 1 / dt
+    update_header(out_path, fs=fs, t0=float(firsts[0]))
+    return {'n_samples': n_samples, 'fs': fs, 't0': float(firsts[0])}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Convert time,voltage,current CSV captures to memory-mappable binary captures'
+    )
+    parser.add_argument(
+        'filepath',
+        type=str,
+        help='Path to CSV file containing signal data (time, voltage, current)'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default=None,
+        help=f'Output capture path (default: input path with {EXTENSION} extension)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of parser processes (default: CPU count)'
+    )
+    parser.add_argument(
+        '--chunk-mb',
+        type=float,
+        default=CHUNK_MB,
+        help=f'Size of each parsed byte range in MB (default: {CHUNK_MB})'
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=SPACING_TOLERANCE,
+        help=f'Allowed relative deviation of the sample spacing (default: {SPACING_TOLERANCE})'
+    )
+
+    args = parser.parse_args(argv)
+
+    out_path = args.output or os.path.splitext(args.filepath)[0] + EXTENSION
+    size_mb = os.path.getsize(args.filepath) / 1e6 if os.path.exists(args.filepath) else 0
+
+    print(f"Converting {args.filepath} -> {out_path}")
+    start = time.perf_counter()
+    info = convert(args.filepath, out_path, workers=args.workers, chunk_mb=args.chunk_mb,
+                   tolerance=args.tolerance)
+    elapsed = time.perf_counter() - start
+
+    print(f"  Samples: {info['n_samples']}")
+    print(f"  Sampling Frequency (fs) = {info['fs']:.2f} Hz")
+    print(f"  Start time: {info['t0']:.6f} s")
+    print(f"  Throughput: {size_mb / elapsed:.1f} MB/s ({size_mb:.1f} MB in {elapsed:.2f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import numpy as np
+
+# Constants
+MIN_PERIOD_FRACTION = 0.5  # Crossings closer than this fraction of a nominal period are noise
+
+def zero_crossings(signal, fs, fundamental_freq=50, min_period_fraction=MIN_PERIOD_FRACTION):
+    """Locate rising zero crossings with sub-sample resolution.
+
+    Sign changes are found with one vectorized comparison and refined by
+    linear interpolation between the two samples around each change.
+    Crossings that follow the previous one by less than min_period_fraction
+    of the nominal period (noise chatter around zero) are dropped.
+
+    Args:
+        signal: 1-D signal array, e.g. the voltage
+        fs: Sampling frequency in Hz
+        fundamental_freq: Nominal fundamental frequency in Hz (default: 50)
+        min_period_fraction: Shortest accepted spacing, relative to the
+            nominal period (default: 0.5)
+
+    Returns:
+        Array of fractional sample positions of the rising crossings
+    """
+    signal = np.asarray(signal)
+    idx = np.flatnonzero((signal[:-1] < 0) & (signal[1:] >= 0))
+
+    # Linear interpolation: fraction of a sample after idx where the line hits 0
+    before = signal[idx]
+    crossings = idx + before / (before - signal[idx + 1])
+
+    keep = np.diff(crossings, prepend=-np.inf) >= min_period_fraction * fs / fundamental_freq
+    return crossings[keep]
+
+def cycle_metrics(voltage, current, fs, fundamental_freq=50, crossings=None):
+    """Per-cycle RMS, power and frequency of a recording.
+
+    Cycles run from one rising voltage zero crossing to the next. Each
+    cycle's samples are summed with a single np.add.reduceat over the
+    sample products, so there is no Python loop over cycles. The products
+    are integrated with the trapezoid rule up to the interpolated crossing
+    times, so a cycle spans exactly one period even when it is not a
+    whole number of samples.
+
+    Args:
+        voltage: 1-D voltage samples (defines the cycle boundaries)
+        current: 1-D current samples
+        fs: Sampling frequency in Hz
+        fundamental_freq: Nominal fundamental frequency in Hz (default: 50)
+        crossings: Precomputed crossings from zero_crossings (optional)
+
+    Returns:
+        Dictionary of per-cycle arrays, one entry per complete cycle:
+        - start, end: Cycle boundaries in (fractional) samples
+        - frequency: 1 / cycle duration in Hz
+        - v_rms, i_rms: RMS voltage and current
+        - real_power: Mean instantaneous power
+        - apparent_power: v_rms * i_rms
+    """
+    voltage = np.asarray(voltage)
+    current = np.asarray(current)
+    if crossings is None:
+        crossings = zero_crossings(voltage, fs, fundamental_freq)
+
+    # First sample at or after each crossing; segment k spans starts[k]:starts[k + 1]
+    starts = np.ceil(crossings).astype(np.intp)
+    n_cycles = max(len(starts) - 1, 0)
+    if n_cycles == 0:
+        empty = np.zeros(0)
+        return {name: empty for name in ('start', 'end', 'frequency', 'v_rms', 'i_rms',
+                                          'real_power', 'apparent_power')}
+
+    products = np.stack([voltage * voltage, current * current, voltage * current])
+    # The last segment runs to the end of the signal and is incomplete
+    sums = np.add.reduceat(products, starts, axis=-1)[:, :-1]
+    # Integrate the linearly interpolated products from crossing to crossing:
+    # trapezoids between the samples of each cycle, plus the fractional
+    # intervals from a crossing to the next sample and from the last sample
+    # of a cycle to the crossing that ends it
+    after = starts - crossings  # Fraction of a sample from each crossing to the next sample
+    at_crossing = products[:, starts] - after * (products[:, starts] - products[:, starts - 1])
+    head = after * (at_crossing + products[:, starts]) / 2
+    tail = (1 - after) * (products[:, starts - 1] + at_crossing) / 2
+    integrals = (sums - (products[:, starts[:-1]] + products[:, starts[1:] - 1]) / 2
+                 + head[:, :-1] + tail[:, 1:])
+    means = integrals / np.diff(crossings)
+
+    v_rms, i_rms = np.sqrt(means[:2])
+    return {
+        'start': crossings[:-1],
+        'end': crossings[1:],
+        'frequency': fs / np.diff(crossings),
+        'v_rms': v_rms,
+        'i_rms': i_rms,
+        'real_power': means[2],
+        'apparent_power': v_rms * i_rms
+    }
@@ -1,43 +1,55 @@
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from matplotlib.gridspec import GridSpec
 import argparse
-import os
-import sys
-
-# Add src to path to import analyze_thd and detect_anomaly
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from analyze_thd import calculate_thd
-from detect_anomaly import extract_features, detect_anomaly
+from .ingest import load_recording
+from .pipeline import Pipeline
+from .resample import decimate_recording
+from .spectral import bin_width
+from .streaming import HarmonicTracker
 
 class DSPDashboard:
-    def __init__(self, filepath, window_size=0.1, refresh_rate=50):
+    def __init__(self, filepath, window_size=0.1, refresh_rate=50, decimate=False):
         self.filepath = filepath
         self.window_size = window_size  # seconds
         self.refresh_rate = refresh_rate  # ms
         
         # Load data
-        if not os.path.exists(filepath):
-            raise FileNotFoundError(f"File not found: {filepath}")
-        
-        self.df = pd.read_csv(filepath)
-        
-        # Calculate sampling frequency
-        if 'time' in self.df.columns and len(self.df) > 1:
-            time_diff = self.df['time'].iloc[1] - self.df['time'].iloc[0]
-            self.fs = 1 / time_diff if time_diff > 0 else 1000
-        else:
-            self.fs = 1000
+        self.signal = load_recording(filepath)
+        if decimate:
+            # Analyze at the rate the 10th harmonic needs, not the logger rate
+            self.signal = decimate_recording(self.signal, n=int(self.window_size * self.signal.fs))
+        self.fs = self.signal.fs
             
         self.window_samples = int(self.window_size * self.fs)
+        self.step = max(int(self.refresh_rate / 1000 * self.fs), 1)  # Advance by refresh rate duration
         self.current_idx = 0
-        self.total_samples = len(self.df)
+        self.total_samples = len(self.signal)
+        
+        # Metrics follow the stream sample by sample instead of per-frame FFTs
+        self.tracker = HarmonicTracker(self.fs, self.window_samples)
+        self.tracked_idx = 0  # Next sample to feed to the tracker
+        
+        # Spectrum and verdict of each frame, each computed once
+        self.pipeline = Pipeline(self.fs, fundamental_freq=50, thd_threshold=5.0)
+        self.xf = np.arange(self.window_samples // 2) * bin_width(self.window_samples, self.fs)
         
         # Setup plot
         self.setup_plot()
         
+    def track(self, end_idx):
+        """Feed the tracker up to end_idx and return the metrics of the last window."""
+        if end_idx < self.tracked_idx:
+            # Playback looped; start tracking from the beginning again
+            self.tracker.reset()
+            self.tracked_idx = 0
+        
+        new = self.signal.slice(self.tracked_idx, end_idx)
+        metrics = self.tracker.update(new['voltage'], new['current'])
+        self.tracked_idx = end_idx
+        return {name: values[-1] for name, values in metrics.items()}
+        
     def setup_plot(self):
         self.fig = plt.figure(figsize=(14, 9))
         self.fig.suptitle("DSP Fiesta - Real-Time Power Monitoring Dashboard", fontsize=16, fontweight='bold')
@@ -55,8 +67,8 @@ class DSPDashboard:
         self.ax_time.legend(loc='upper right')
         
         # Set fixed y-limits based on data range
-        v_max = self.df['voltage'].abs().max() * 1.1
-        i_max = self.df['current'].abs().max() * 1.1
+        v_max = np.max(np.abs(self.signal['voltage'])) * 1.1
+        i_max = np.max(np.abs(self.signal['current'])) * 1.1
         # Use twinx for current to scale it properly if needed, but for simplicity plotting on same axis with different scales is tricky.
         # Let's use a secondary y-axis for current.
         self.ax_time_i = self.ax_time.twinx()
@@ -107,23 +119,23 @@ class DSPDashboard:
             end_idx = self.window_samples
             
         # Get data chunk
-        chunk = self.df.iloc[start_idx:end_idx]
-        t = chunk['time'].values
-        v = chunk['voltage'].values
-        i = chunk['current'].values
+        chunk = self.signal.slice(start_idx, end_idx)
+        t = chunk.time
+        v = chunk['voltage']
+        i = chunk['current']
         
         # Update Time Plot
         self.line_v.set_data(t, v)
         self.line_i.set_data(t, i)
         self.ax_time.set_xlim(t[0], t[-1])
         
-        # Extract Features & Detect Anomaly
-        # Create a mini-dataframe for the feature extraction function
-        chunk_df = pd.DataFrame({'voltage': v, 'current': i})
-        features = extract_features(chunk_df, self.fs)
+        # Metrics of the window ending at the newest sample
+        features = self.track(end_idx)
         
-        # Detect Anomaly
-        is_anomaly, reason = detect_anomaly(features, thd_threshold=5.0)
+        # The tracked harmonics are the only THD source (text, verdict and
+        # markers); the frame's spectrum only feeds the plot line
+        results = self.pipeline.run(['amplitudes', 'verdict'], filtered=np.stack([v, i]), features=features)
+        is_anomaly, reason = results['verdict']
         
         # Update Metrics Text
         self.text_v_rms.set_text(f"Voltage RMS: {features['v_rms']:.2f} V")
@@ -141,21 +153,13 @@ class DSPDashboard:
             self.status_rect.set_alpha(0.8)
             self.text_status.set_text("NORMAL")
             
-        # Update FFT Plot
-        # Recalculate THD to get spectrum data (re-using logic from analyze_thd would be efficient but let's just call it)
-        # Actually extract_features calls calculate_thd but discards spectrum. 
-        # Let's call calculate_thd directly here to get spectrum for plotting.
-        thd, harmonics, (xf, yf) = calculate_thd(i, self.fs, fundamental_freq=50)
-        
-        self.line_fft.set_data(xf, yf)
-        
-        harm_freqs = [h[0] for h in harmonics]
-        harm_amps = [h[1] for h in harmonics]
-        self.line_harmonics.set_data(harm_freqs, harm_amps)
+        # Update FFT Plot (current channel, orders 2 and up)
+        freqs, amps = self.tracker.harmonics()
+        self.line_fft.set_data(self.xf, results['amplitudes'][1])
+        self.line_harmonics.set_data(freqs[1:], amps[1, 1:])
         
         # Advance index
-        step = int(self.refresh_rate / 1000 * self.fs)  # Advance by refresh rate duration
-        self.current_idx += step
+        self.current_idx += self.step
         
         return self.line_v, self.line_i, self.line_fft, self.line_harmonics, self.text_v_rms, self.text_i_rms, self.text_power, self.text_thd, self.status_rect, self.text_status
 
@@ -163,15 +167,18 @@ class DSPDashboard:
         ani = animation.FuncAnimation(self.fig, self.update, interval=self.refresh_rate, blit=False)
         plt.show()
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Real-Time DSP Visualization Dashboard')
     parser.add_argument('filepath', type=str, help='Path to CSV file (e.g., data/illegal_tap.csv)')
     parser.add_argument('--window', type=float, default=0.1, help='Window size in seconds (default: 0.1)')
     parser.add_argument('--refresh', type=int, default=50, help='Refresh rate in ms (default: 50)')
+    parser.add_argument('--decimate', action='store_true',
+                        help='Downsample high-rate captures to the harmonic analysis rate first')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
-    dashboard = DSPDashboard(args.filepath, window_size=args.window, refresh_rate=args.refresh)
+    dashboard = DSPDashboard(args.filepath, window_size=args.window, refresh_rate=args.refresh,
+                             decimate=args.decimate)
     dashboard.run()
 
 if __name__ == "__main__":
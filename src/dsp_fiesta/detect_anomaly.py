@@ -0,0 +1,212 @@
+import numpy as np
+import argparse
+from .analyze_thd import THD_BACKENDS
+from .ingest import CHUNK_SIZE, iter_blocks, load_recording, read_columns
+from .power_quality import power_features
+from .signal_data import estimate_sampling_frequency
+from .streaming import WindowBuffer
+
+# Constants
+WINDOW_SIZE = 0.2  # Analysis window in seconds (10 cycles at 50 Hz)
+
+def extract_features(df, fs=1000, thd_backend='fft'):
+    """Extract DSP features from voltage and current signals.
+    
+    Args:
+        df: DataFrame or SignalData with 'voltage' and 'current' columns
+        fs: Sampling frequency
+        thd_backend: 'fft' (full spectrum), 'dft' (harmonic bins only) or
+            'sync' (cycle-locked windows), see power_quality.power_features
+        
+    Returns:
+        Dictionary of features (see power_quality.power_features)
+    """
+    features = power_features(df['voltage'], df['current'], fs, fundamental_freq=50, thd_backend=thd_backend)
+    return {name: float(value) for name, value in features.items()}
+
+def extract_features_batch(voltage, current, fs=1000, thd_backend='fft'):
+    """Extract DSP features from stacks of voltage and current windows.
+    
+    Batched counterpart of extract_features: all windows of both channels
+    share a single FFT call.
+    
+    Args:
+        voltage: Voltage windows, shape (..., window_len)
+        current: Current windows, shape (..., window_len)
+        fs: Sampling frequency
+        thd_backend: 'fft' or 'dft' (see extract_features)
+        
+    Returns:
+        Dictionary of feature arrays with shape (...)
+    """
+    return power_features(voltage, current, fs, fundamental_freq=50, thd_backend=thd_backend)
+
+def stream_features(chunks, fs=1000, window_size=WINDOW_SIZE, hop_size=None, t0=0.0, thd_backend='fft'):
+    """Extract features over sliding windows of a stream of sample chunks.
+    
+    Windows are assembled in a bounded overlap buffer and processed in
+    batches, so memory use does not grow with the length of the recording.
+    
+    Args:
+        chunks: Iterable of (voltage, current) array pairs
+        fs: Sampling frequency
+        window_size: Window length in seconds (default: 0.2)
+        hop_size: Window advance in seconds (default: half the window)
+        t0: Time of the first sample in seconds
+        thd_backend: 'fft' or 'dft' (see extract_features)
+        
+    Yields:
+        Feature dictionary per window, with 'start_time' and 'end_time'
+    """
+    window_len = int(round(window_size * fs))
+    hop = int(round(hop_size * fs)) if hop_size else max(window_len // 2, 1)
+    buffer = WindowBuffer(window_len, hop)
+    
+    for voltage, current in chunks:
+        for starts, (v, i) in buffer.push(voltage, current):
+            features = extract_features_batch(v, i, fs, thd_backend)
+            for k, start in enumerate(starts):
+                record = {
+                    'start_time': t0 + start / fs,
+                    'end_time': t0 + (start + window_len) / fs
+                }
+                record.update({name: values[k] for name, values in features.items()})
+                yield record
+
+def detect_anomaly(features, thd_threshold=5.0):
+    """Detect anomaly based on features.
+    
+    Args:
+        features: Dictionary of extracted features
+        thd_threshold: Threshold for THD in percent
+        
+    Returns:
+        is_anomaly: Boolean
+        reason: String explaining the reason
+    """
+    reasons = []
+    is_anomaly = False
+    
+    # Check THD
+    if features['thd_current'] > thd_threshold:
+        is_anomaly = True
+        reasons.append(f"High THD ({features['thd_current']:.2f}% > {thd_threshold}%)")
+        
+    # We could add other checks here (e.g., Overcurrent)
+    
+    if is_anomaly:
+        return True, ", ".join(reasons)
+    else:
+        return False, "Normal"
+
+def stream_main(args, columns):
+    """Classify sliding windows of a file without loading it into memory."""
+    blocks = iter_blocks(args.filepath, columns=columns, chunksize=args.chunksize, dtype=args.dtype)
+    first = next(blocks, None)
+    if first is None:
+        raise ValueError(f"No samples found in {args.filepath}")
+    
+    # Calculate sampling frequency
+    if 'time' in columns:
+        fs = estimate_sampling_frequency(first[0])
+        t0 = first[0][0]
+    else:
+        fs = 1000
+        t0 = 0.0
+    
+    def chunks():
+        yield first[-2:]
+        for block in blocks:
+            yield block[-2:]
+    
+    def decimated(decimator):
+        for chunk in chunks():
+            yield decimator.process(np.vstack(chunk))
+        yield decimator.flush()
+    
+    signals = chunks()
+    if args.decimate:
+        # Downsample on the fly through the same stages as decimate_recording;
+        # windows keep a whole number of samples
+        from .resample import StreamingDecimator, analysis_rate
+        q, fs = analysis_rate(fs, n=int(args.window * fs))
+        if q > 1:
+            signals = decimated(StreamingDecimator(q))
+    
+    print(f"Streaming {args.filepath} in {args.window:g} s windows...")
+    
+    n_windows = 0
+    anomalies = []
+    for features in stream_features(signals, fs, window_size=args.window, hop_size=args.hop, t0=t0,
+                                    thd_backend=args.thd_backend):
+        n_windows += 1
+        is_anomaly, reason = detect_anomaly(features, thd_threshold=args.thd_threshold)
+        if is_anomaly:
+            anomalies.append(features['start_time'])
+            print(f"  🔴 {features['start_time']:.3f}-{features['end_time']:.3f} s: {reason}")
+    
+    print("\nClassification Result:")
+    if anomalies:
+        print(f"  🔴 ANOMALY DETECTED in {len(anomalies)} of {n_windows} windows "
+              f"(first at t={anomalies[0]:.3f} s)")
+    else:
+        print(f"  🟢 NORMAL: {n_windows} windows analyzed")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Detect anomalies in power signals')
+    parser.add_argument('filepath', type=str, help='Path to CSV file')
+    parser.add_argument('--thd-threshold', type=float, default=5.0, help='THD threshold in percent (default: 5.0)')
+    parser.add_argument('--window', type=float, default=None,
+                        help='Stream the file and classify sliding windows of this length in seconds')
+    parser.add_argument('--hop', type=float, default=None, help='Window advance in seconds (default: half the window)')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE,
+                        help=f'Rows read per chunk in streaming mode (default: {CHUNK_SIZE})')
+    parser.add_argument('--dtype', type=str, choices=['float32', 'float64'], default='float64',
+                        help='Sample dtype used in streaming mode (default: float64)')
+    parser.add_argument('--thd-backend', type=str, choices=THD_BACKENDS, default='fft',
+                        help='THD from the full FFT, the harmonic bins only or cycle-locked windows (default: fft)')
+    parser.add_argument('--decimate', action='store_true',
+                        help='Downsample high-rate captures to the harmonic analysis rate first')
+    
+    args = parser.parse_args(argv)
+    
+    if args.window:
+        # Time is optional; fall back to 1 kHz without it
+        columns = [col for col in ['time'] if col in read_columns(args.filepath)] + ['voltage', 'current']
+        stream_main(args, columns)
+        return
+    
+    recording = load_recording(args.filepath)
+    if args.decimate:
+        from .resample import decimate_recording
+        recording = decimate_recording(recording)
+    fs = recording.fs
+        
+    print(f"Analyzing {args.filepath}...")
+    
+    # Extract features
+    features = extract_features(recording, fs, thd_backend=args.thd_backend)
+    
+    print("\nExtracted Features:")
+    print(f"  Voltage RMS: {features['v_rms']:.2f} V")
+    print(f"  Current RMS: {features['i_rms']:.2f} A")
+    print(f"  Real Power: {features['real_power']:.2f} W")
+    print(f"  Reactive Power: {features['reactive_power']:.2f} var")
+    print(f"  Apparent Power: {features['apparent_power']:.2f} VA")
+    print(f"  Distortion Power: {features['distortion_power']:.2f} VA")
+    print(f"  Power Factor: {features['power_factor']:.3f} (displacement {features['displacement_pf']:.3f})")
+    print(f"  Crest Factor: {features['crest_factor_v']:.2f} (V), {features['crest_factor_i']:.2f} (I)")
+    print(f"  Voltage THD: {features['thd_voltage']:.2f}%")
+    print(f"  Current THD: {features['thd_current']:.2f}%")
+    
+    # Detect anomaly
+    is_anomaly, reason = detect_anomaly(features, thd_threshold=args.thd_threshold)
+    
+    print("\nClassification Result:")
+    if is_anomaly:
+        print(f"  🔴 ANOMALY DETECTED: {reason}")
+    else:
+        print(f"  🟢 NORMAL: {reason}")
+
+if __name__ == "__main__":
+    main()
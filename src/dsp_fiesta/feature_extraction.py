@@ -1,104 +1,101 @@
 import numpy as np
-import pandas as pd
 import argparse
 import os
+from .cycles import cycle_metrics
+from .ingest import load_recording
+from .streaming import PowerAccumulator
 
 # Constants
 ANOMALY_THRESHOLD_PERCENT = 50  # Power increase threshold for anomaly detection
 DEFAULT_NORMAL_LOAD_PATH = 'data/normal_load.csv'
 DEFAULT_ILLEGAL_TAP_PATH = 'data/illegal_tap.csv'
+POWER_BLOCK_SIZE = 65_536  # Samples per block when scanning power without the full waveform
 
-def calculate_rms(signal):
-    """Calculate Root Mean Square (RMS) of a signal.
-    
-    RMS = sqrt(mean(signal²))
-    
-    Args:
-        signal: Array of signal values
-        
-    Returns:
-        RMS value of the signal
-    """
-    return np.sqrt(np.mean(signal ** 2))
-
-def calculate_power_metrics(voltage, current):
+def calculate_power_metrics(voltage, current, waveform=False):
     """Calculate power metrics from voltage and current signals.
     
+    By default only reductions are computed: the signals are scanned in
+    blocks of POWER_BLOCK_SIZE samples, with fused einsum sums for RMS and
+    average power and a reusable block buffer for the power extremes, so
+    no temporary the length of the signal is allocated.
+    
     Args:
         voltage: Array of voltage values
         current: Array of current values
+        waveform: Also return the instantaneous power array (e.g. for plots)
         
     Returns:
         Dictionary containing:
         - rms_voltage: RMS voltage
         - rms_current: RMS current
         - avg_power: Average power (mean of instantaneous power)
-        - instantaneous_power: Array of instantaneous power values
+        - max_power: Maximum instantaneous power
+        - min_power: Minimum instantaneous power
+        - instantaneous_power: Array of instantaneous power values (only
+          with waveform=True)
     """
-    # Calculate RMS values
-    rms_voltage = calculate_rms(voltage)
-    rms_current = calculate_rms(current)
-    
-    # Calculate instantaneous power: P(t) = V(t) × I(t)
-    instantaneous_power = voltage * current
-    
-    # Calculate average power
-    avg_power = np.mean(instantaneous_power)
-    
-    return {
-        'rms_voltage': rms_voltage,
-        'rms_current': rms_current,
-        'avg_power': avg_power,
-        'instantaneous_power': instantaneous_power
+    voltage = np.asarray(voltage)
+    current = np.asarray(current)
+    accumulator = PowerAccumulator()
+    
+    if waveform:
+        # Calculate instantaneous power: P(t) = V(t) × I(t)
+        instantaneous_power = voltage * current
+        accumulator.update(voltage, current)
+        max_power = np.max(instantaneous_power)
+        min_power = np.min(instantaneous_power)
+    else:
+        # float64 products even for float32 (memory-mapped) captures
+        block = np.empty(min(len(voltage), POWER_BLOCK_SIZE), dtype=np.result_type(voltage, current, np.float64))
+        max_power = -np.inf
+        min_power = np.inf
+        for start in range(0, len(voltage), POWER_BLOCK_SIZE):
+            v = voltage[start:start + POWER_BLOCK_SIZE]
+            i = current[start:start + POWER_BLOCK_SIZE]
+            power = np.multiply(v, i, out=block[:len(v)])
+            max_power = max(max_power, power.max())
+            min_power = min(min_power, power.min())
+            # RMS values and average power from compensated running sums
+            accumulator.update(v, i)
+    
+    metrics = {
+        'rms_voltage': accumulator.v_rms,
+        'rms_current': accumulator.i_rms,
+        'avg_power': accumulator.real_power,
+        'max_power': max_power,
+        'min_power': min_power
     }
+    if waveform:
+        metrics['instantaneous_power'] = instantaneous_power
+    return metrics
 
-def load_signal(filepath):
-    """Load signal data from CSV file.
-    
-    Args:
-        filepath: Path to CSV file containing time, voltage, and current columns
-        
-    Returns:
-        pandas DataFrame with signal data
-    """
-    if not os.path.exists(filepath):
-        raise FileNotFoundError(f"File not found: {filepath}")
-    
-    df = pd.read_csv(filepath)
-    
-    # Validate required columns
-    required_cols = ['time', 'voltage', 'current']
-    if not all(col in df.columns for col in required_cols):
-        raise ValueError(f"CSV must contain columns: {required_cols}")
-    
-    return df
-
-def analyze_signal(filepath, verbose=True):
+def analyze_signal(filepath, verbose=True, cycles=False):
     """Analyze signal and compute RMS and power metrics.
     
     Args:
         filepath: Path to CSV file containing signal data
         verbose: Whether to print detailed output
+        cycles: Also compute per-cycle metrics between voltage zero
+            crossings (stored under 'cycles', see cycles.cycle_metrics)
         
     Returns:
         Dictionary containing computed metrics
     """
-    # Load data
-    df = load_signal(filepath)
-    
-    # Extract voltage and current
-    voltage = df['voltage'].values
-    current = df['current'].values
+    # Load data (float32 binary captures stay memory-mapped and are read
+    # block by block below)
+    recording = load_recording(filepath)
     
     # Calculate metrics
-    metrics = calculate_power_metrics(voltage, current)
+    metrics = calculate_power_metrics(recording['voltage'], recording['current'])
+    if cycles:
+        metrics['cycles'] = cycle_metrics(recording['voltage'], recording['current'], recording.fs)
     
     if verbose:
         print(f"\n{'='*60}")
         print(f"Signal Analysis: {os.path.basename(filepath)}")
         print(f"{'='*60}")
-        print(f"Number of samples: {len(df)}")
-        print(f"Duration: {df['time'].iloc[-1] - df['time'].iloc[0]:.2f} seconds")
+        print(f"Number of samples: {len(recording)}")
+        print(f"Duration: {(len(recording) - 1) / recording.fs:.2f} seconds")
         print(f"\n{'RMS Values':^60}")
         print(f"{'-'*60}")
         print(f"  RMS Voltage:  {metrics['rms_voltage']:>10.2f} V")
@@ -106,13 +103,24 @@ def analyze_signal(filepath, verbose=True):
         print(f"\n{'Power Metrics':^60}")
         print(f"{'-'*60}")
         print(f"  Average Power: {metrics['avg_power']:>10.2f} W")
-        print(f"  Max Power:     {np.max(metrics['instantaneous_power']):>10.2f} W")
-        print(f"  Min Power:     {np.min(metrics['instantaneous_power']):>10.2f} W")
+        print(f"  Max Power:     {metrics['max_power']:>10.2f} W")
+        print(f"  Min Power:     {metrics['min_power']:>10.2f} W")
+        if cycles and len(metrics['cycles']['frequency']):
+            per_cycle = metrics['cycles']
+            print(f"\n{'Per-Cycle Metrics':^60}")
+            print(f"{'-'*60}")
+            print(f"  Cycles:        {len(per_cycle['frequency']):>10d}")
+            print(f"  Frequency:     {np.min(per_cycle['frequency']):>10.3f} - "
+                  f"{np.max(per_cycle['frequency']):.3f} Hz")
+            print(f"  RMS Voltage:   {np.min(per_cycle['v_rms']):>10.2f} - {np.max(per_cycle['v_rms']):.2f} V")
+            print(f"  RMS Current:   {np.min(per_cycle['i_rms']):>10.2f} - {np.max(per_cycle['i_rms']):.2f} A")
+            print(f"  Power:         {np.min(per_cycle['real_power']):>10.2f} - "
+                  f"{np.max(per_cycle['real_power']):.2f} W")
         print(f"{'='*60}\n")
     
     return metrics
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description='Extract RMS and power features from electrical signal data'
     )
@@ -128,8 +136,13 @@ def main():
         action='store_true',
         help='Compare normal load vs illegal tap (requires data/ folder)'
     )
+    parser.add_argument(
+        '--cycles',
+        action='store_true',
+        help='Also report per-cycle metrics between voltage zero crossings'
+    )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     if args.compare:
         # Compare both scenarios
@@ -142,15 +155,15 @@ def main():
         
         if not os.path.exists(normal_path) or not os.path.exists(tap_path):
             print("\nError: Data files not found.")
-            print("Please run generate_data.py from the project root:")
-            print("  python src/generate_data.py")
+            print("Please generate the datasets from the project root:")
+            print("  dsp-fiesta generate")
             return
         
         # Analyze normal load
-        normal_metrics = analyze_signal(normal_path, verbose=True)
+        normal_metrics = analyze_signal(normal_path, verbose=True, cycles=args.cycles)
         
         # Analyze illegal tap
-        tap_metrics = analyze_signal(tap_path, verbose=True)
+        tap_metrics = analyze_signal(tap_path, verbose=True, cycles=args.cycles)
         
         # Show comparison
         print(f"\n{'='*60}")
@@ -186,12 +199,12 @@ def main():
         
     elif args.filepath:
         # Analyze single file
-        analyze_signal(args.filepath, verbose=True)
+        analyze_signal(args.filepath, verbose=True, cycles=args.cycles)
     else:
         print("Error: Please specify a file path or use --compare")
         print("\nUsage:")
-        print("  python src/feature_extraction.py data/normal_load.csv")
-        print("  python src/feature_extraction.py --compare")
+        print("  dsp-fiesta features data/normal_load.csv")
+        print("  dsp-fiesta features --compare")
 
 if __name__ == "__main__":
     main()
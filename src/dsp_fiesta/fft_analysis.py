@@ -1,41 +1,24 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import argparse
-import os
+from .ingest import load_recording
+from .signal_data import SignalData, estimate_sampling_frequency
+from .spectral import amplitude_spectrum
 
 # Constants
 FS = 1000  # Sampling frequency (Hz) - same as in generate_data.py
 MAX_PEAK_ANNOTATIONS = 5  # Maximum number of peaks to annotate in frequency plots
 FREQ_TOLERANCE_MULTIPLIER = 2  # Multiplier for frequency tolerance in harmonic detection
 
-def load_signal(filepath):
-    """Load signal data from CSV file.
-    
-    Args:
-        filepath: Path to CSV file containing time, voltage, and current columns
-        
-    Returns:
-        pandas DataFrame with signal data
-    """
-    if not os.path.exists(filepath):
-        raise FileNotFoundError(f"File not found: {filepath}")
-    
-    df = pd.read_csv(filepath)
-    
-    # Validate required columns
-    required_cols = ['time', 'voltage', 'current']
-    if not all(col in df.columns for col in required_cols):
-        raise ValueError(f"CSV must contain columns: {required_cols}")
-    
-    return df
-
-def compute_fft(signal, fs):
+def compute_fft(signal, fs, workers=None, max_freq=None):
     """Compute FFT of a signal.
     
     Args:
         signal: Input signal (numpy array or pandas Series)
         fs: Sampling frequency in Hz
+        workers: Number of threads for the FFT (default: None)
+        max_freq: If given, first downsample to the lowest analysis rate
+            that still covers max_freq Hz (default: None, full rate)
         
     Returns:
         Tuple of (frequencies, magnitude spectrum)
@@ -44,44 +27,49 @@ def compute_fft(signal, fs):
     if isinstance(signal, pd.Series):
         signal = signal.values
     
-    # Compute FFT
-    n = len(signal)
-    fft_result = np.fft.fft(signal)
-    
-    # Compute magnitude spectrum (only positive frequencies)
-    magnitude = np.abs(fft_result)
+    if max_freq is not None:
+        from .resample import decimate_for_analysis
+        signal, fs = decimate_for_analysis(signal, fs, fundamental_freq=max_freq, max_harmonic=1)
     
-    # Compute frequency bins
-    frequencies = np.fft.fftfreq(n, 1/fs)
+    # Real-input FFT: only non-negative frequencies are computed
+    n = len(signal)
+    frequencies, magnitude = amplitude_spectrum(signal, fs, workers)
     
-    # Return only positive frequencies
-    positive_freq_idx = frequencies >= 0
-    frequencies = frequencies[positive_freq_idx]
-    magnitude = magnitude[positive_freq_idx]
+    # Keep the bins fftfreq reports as non-negative (drops Nyquist for even n)
+    frequencies = frequencies[:(n + 1)//2]
+    magnitude = magnitude[:(n + 1)//2]
     
-    # Normalize magnitude (divide by n for proper scaling)
-    magnitude = magnitude / n * 2  # *2 to account for negative frequencies
-    magnitude[0] = magnitude[0] / 2  # DC component should not be doubled
+    # DC component should not be doubled
+    magnitude[0] = magnitude[0] / 2
     
     return frequencies, magnitude
 
+def _sampling_frequency(data):
+    """fs of a SignalData, or estimated from the 'time' column of a DataFrame."""
+    if isinstance(data, SignalData):
+        return data.fs
+    return estimate_sampling_frequency(data['time'].values, FS)
+
 def plot_frequency_spectrum(df, signal_type='voltage', title="Frequency Spectrum", 
-                            xlim=None, save_path=None):
+                            xlim=None, save_path=None, decimate=False):
     """Plot frequency spectrum of a signal.
     
     Args:
-        df: DataFrame containing signal data
+        df: SignalData or DataFrame (with a 'time' column) of signal data
         signal_type: Type of signal to analyze ('voltage' or 'current')
         title: Plot title
         xlim: X-axis limits (max frequency to display)
         save_path: Path to save the plot (if None, displays instead)
+        decimate: Downsample to the rate needed for the displayed band first
     """
+    # Imported on first plot so headless analysis never loads matplotlib
+    import matplotlib.pyplot as plt
+    
     # Calculate sampling frequency from data
-    time_diff = df['time'].iloc[1] - df['time'].iloc[0]
-    fs = 1 / time_diff if time_diff > 0 else FS
+    fs = _sampling_frequency(df)
     
     # Compute FFT
-    frequencies, magnitude = compute_fft(df[signal_type], fs)
+    frequencies, magnitude = compute_fft(df[signal_type], fs, max_freq=(xlim or 500) if decimate else None)
     
     # Create plot
     fig, ax = plt.subplots(figsize=(12, 6))
@@ -109,23 +97,27 @@ def plot_frequency_spectrum(df, signal_type='voltage', title="Frequency Spectrum
     
     return fig
 
-def compare_spectra(normal_df, illegal_df, signal_type='current', xlim=300, save_path=None):
+def compare_spectra(normal_df, illegal_df, signal_type='current', xlim=300, save_path=None, decimate=False):
     """Compare frequency spectra of normal load vs illegal tap signals.
     
     Args:
-        normal_df: DataFrame with normal load signal data
-        illegal_df: DataFrame with illegal tap signal data
+        normal_df: SignalData or DataFrame with normal load signal data
+        illegal_df: SignalData or DataFrame with illegal tap signal data
         signal_type: Type of signal to analyze ('voltage' or 'current')
         xlim: Maximum frequency to display
         save_path: Path to save the plot (if None, displays instead)
+        decimate: Downsample to the rate needed for the displayed band first
     """
+    # Imported on first plot so headless analysis never loads matplotlib
+    import matplotlib.pyplot as plt
+    
     # Calculate sampling frequency
-    time_diff = normal_df['time'].iloc[1] - normal_df['time'].iloc[0]
-    fs = 1 / time_diff if time_diff > 0 else FS
+    fs = _sampling_frequency(normal_df)
     
     # Compute FFT for both signals
-    freq_normal, mag_normal = compute_fft(normal_df[signal_type], fs)
-    freq_illegal, mag_illegal = compute_fft(illegal_df[signal_type], fs)
+    max_freq = xlim if decimate else None
+    freq_normal, mag_normal = compute_fft(normal_df[signal_type], fs, max_freq=max_freq)
+    freq_illegal, mag_illegal = compute_fft(illegal_df[signal_type], fs, max_freq=max_freq)
     
     # Create comparison plot
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
@@ -207,23 +199,28 @@ def _get_ordinal_suffix(n):
     else:
         return 'th'
 
-def analyze_harmonics(df, signal_type='current', fundamental_freq=50):
+def analyze_harmonics(df, signal_type='current', fundamental_freq=50, workers=None, decimate=False):
     """Analyze and display harmonic content using pandas DataFrame.
     
     Args:
-        df: DataFrame with signal data
+        df: SignalData or DataFrame (with a 'time' column) of signal data
         signal_type: Type of signal to analyze ('voltage' or 'current')
         fundamental_freq: Fundamental frequency in Hz (default: 50 Hz)
+        workers: Number of threads for the FFT (default: None)
+        decimate: Downsample to the analysis rate of the 10th harmonic first
         
     Returns:
         DataFrame with harmonic analysis results
     """
     # Calculate sampling frequency
-    time_diff = df['time'].iloc[1] - df['time'].iloc[0]
-    fs = 1 / time_diff if time_diff > 0 else FS
+    fs = _sampling_frequency(df)
+    signal = np.asarray(df[signal_type])
+    if decimate:
+        from .resample import decimate_for_analysis
+        signal, fs = decimate_for_analysis(signal, fs, fundamental_freq)
     
     # Compute FFT
-    frequencies, magnitude = compute_fft(df[signal_type], fs)
+    frequencies, magnitude = compute_fft(signal, fs, workers)
     
     # Get fundamental magnitude for percentage calculation
     fundamental_idx = np.argmin(np.abs(frequencies - fundamental_freq))
@@ -256,7 +253,7 @@ def analyze_harmonics(df, signal_type='current', fundamental_freq=50):
     
     return harmonics_df
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description='Perform FFT and frequency-domain analysis on electrical signals'
     )
@@ -295,50 +292,55 @@ def main():
         action='store_true',
         help='Display harmonic analysis table using pandas'
     )
+    parser.add_argument(
+        '--decimate',
+        action='store_true',
+        help='Downsample to the analysis rate of the displayed band before the FFT'
+    )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Load signal data
     print(f"Loading signal data from: {args.filepath}")
-    df = load_signal(args.filepath)
+    df = load_recording(args.filepath)
     print(f"Loaded {len(df)} samples")
     
     if args.compare:
         # Comparison mode
         print(f"\nLoading comparison data from: {args.compare}")
-        df_compare = load_signal(args.compare)
+        df_compare = load_recording(args.compare)
         print(f"Loaded {len(df_compare)} samples for comparison")
         
         print(f"\nComparing {args.signal} frequency spectra...")
         compare_spectra(df, df_compare, signal_type=args.signal, 
-                       xlim=args.xlim, save_path=args.save)
+                       xlim=args.xlim, save_path=args.save, decimate=args.decimate)
         
         # Show harmonics analysis for both signals if requested
         if args.show_harmonics:
             print(f"\n{'='*60}")
             print(f"Harmonic Analysis - File 1: {args.filepath}")
             print(f"{'='*60}")
-            harmonics_df1 = analyze_harmonics(df, signal_type=args.signal)
+            harmonics_df1 = analyze_harmonics(df, signal_type=args.signal, decimate=args.decimate)
             print(harmonics_df1.to_string(index=False))
             
             print(f"\n{'='*60}")
             print(f"Harmonic Analysis - File 2: {args.compare}")
             print(f"{'='*60}")
-            harmonics_df2 = analyze_harmonics(df_compare, signal_type=args.signal)
+            harmonics_df2 = analyze_harmonics(df_compare, signal_type=args.signal, decimate=args.decimate)
             print(harmonics_df2.to_string(index=False))
     else:
         # Single file analysis
         print(f"\nComputing FFT for {args.signal}...")
         plot_frequency_spectrum(df, signal_type=args.signal, 
                                title=f"Frequency Spectrum - {args.filepath}",
-                               xlim=args.xlim, save_path=args.save)
+                               xlim=args.xlim, save_path=args.save, decimate=args.decimate)
         
         # Show harmonics analysis if requested
         if args.show_harmonics:
             print(f"\n{'='*60}")
             print(f"Harmonic Analysis - {args.signal.capitalize()}")
             print(f"{'='*60}")
-            harmonics_df = analyze_harmonics(df, signal_type=args.signal)
+            harmonics_df = analyze_harmonics(df, signal_type=args.signal, decimate=args.decimate)
             print(harmonics_df.to_string(index=False))
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
+import argparse
 import os
+from .capture import EXTENSION, write_capture
 
 # Constants
 FS = 1000  # Sampling frequency (Hz)
@@ -63,18 +65,47 @@ def generate_illegal_tap():
     df = pd.DataFrame({'time': t, 'voltage': voltage, 'current': current})
     return df
 
-def main():
+def save_dataset(df, name, fmt='csv', dtype='float32'):
+    """Save a generated dataset to data/ as CSV or binary capture.
+    
+    Args:
+        df: DataFrame with time, voltage, current columns
+        name: File name without extension
+        fmt: Output format, 'csv' or 'binary' (default: csv)
+        dtype: Sample dtype for binary captures, 'float32' or 'int16'
+        
+    Returns:
+        Path of the written file
+    """
+    if fmt == 'binary':
+        path = f'data/{name}{EXTENSION}'
+        write_capture(path, {'voltage': df['voltage'].values, 'current': df['current'].values},
+                      fs=FS, t0=df['time'].iloc[0], dtype=dtype)
+    else:
+        path = f'data/{name}.csv'
+        df.to_csv(path, index=False)
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate synthetic power signal datasets')
+    parser.add_argument('--format', type=str, choices=['csv', 'binary'], default='csv',
+                        help='Output format (default: csv)')
+    parser.add_argument('--dtype', type=str, choices=['float32', 'int16'], default='float32',
+                        help='Sample dtype for binary captures (default: float32)')
+    
+    args = parser.parse_args(argv)
+    
     os.makedirs('data', exist_ok=True)
     
     print("Generating normal load data...")
     normal_df = generate_normal_load()
-    normal_df.to_csv('data/normal_load.csv', index=False)
-    print(f"Saved data/normal_load.csv ({len(normal_df)} rows)")
+    path = save_dataset(normal_df, 'normal_load', args.format, args.dtype)
+    print(f"Saved {path} ({len(normal_df)} rows)")
     
     print("Generating illegal tap data...")
     tap_df = generate_illegal_tap()
-    tap_df.to_csv('data/illegal_tap.csv', index=False)
-    print(f"Saved data/illegal_tap.csv ({len(tap_df)} rows)")
+    path = save_dataset(tap_df, 'illegal_tap', args.format, args.dtype)
+    print(f"Saved {path} ({len(tap_df)} rows)")
 
 if __name__ == "__main__":
     main()
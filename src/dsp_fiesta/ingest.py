@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+import os
+from . import capture
+from .signal_data import FS, SignalData
+
+# Constants
+SIGNAL_COLUMNS = ['time', 'voltage', 'current']
+CHUNK_SIZE = 100_000  # Rows parsed per chunk
+
+def read_columns(filepath):
+    """Read the column names of a capture without parsing any data.
+
+    Binary captures report an implicit 'time' column followed by their
+    channel names.
+
+    Args:
+        filepath: Path to CSV or binary capture file
+
+    Returns:
+        List of column names
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"File not found: {filepath}")
+
+    if capture.is_capture(filepath):
+        return ['time'] + capture.read_header(filepath)['channels']
+    return list(pd.read_csv(filepath, nrows=0).columns)
+
+def validate_columns(filepath, columns=SIGNAL_COLUMNS):
+    """Check that a capture contains the required columns.
+
+    Args:
+        filepath: Path to CSV or binary capture file
+        columns: Required column names
+
+    Returns:
+        List of all column names in the file
+    """
+    available = read_columns(filepath)
+    if not all(col in available for col in columns):
+        raise ValueError(f"CSV must contain columns: {columns}")
+
+    return available
+
+def _column_dtypes(columns, dtype):
+    """Signal columns use dtype; time stays float64 to keep sub-sample precision."""
+    return {col: np.float64 if col == 'time' else dtype for col in columns}
+
+def _capture_columns(meta, data, columns, start, stop, dtype):
+    """Requested columns of a memory-mapped capture over [start, stop).
+
+    Channels are cast only if dtype is given and differs from theirs.
+    """
+    result = []
+    for col in columns:
+        if col == 'time':
+            result.append(meta['t0'] + np.arange(start, stop) / meta['fs'])
+        else:
+            values = capture.channel_view(meta, data, col, start, stop)
+            result.append(values if dtype is None or values.dtype == dtype else values.astype(dtype))
+    return tuple(result)
+
+def iter_blocks(filepath, columns=SIGNAL_COLUMNS, chunksize=CHUNK_SIZE, dtype=np.float64):
+    """Read a capture as a sequence of fixed-size NumPy blocks.
+
+    Columns are validated once up front; memory use is bounded by chunksize
+    regardless of the file size. Binary captures are memory-mapped, and
+    float32 blocks of unscaled channels are zero-copy views of the file.
+
+    Args:
+        filepath: Path to CSV or binary capture file
+        columns: Columns to read, in the order they are returned
+        chunksize: Number of rows per block (default: 100000)
+        dtype: Floating point dtype of the signal columns (default: float64)
+
+    Yields:
+        Tuple with one 1-D array per requested column
+    """
+    validate_columns(filepath, columns)
+
+    if capture.is_capture(filepath):
+        meta, data = capture.open_capture(filepath)
+        for start in range(0, meta['n_samples'], chunksize):
+            stop = min(start + chunksize, meta['n_samples'])
+            yield _capture_columns(meta, data, columns, start, stop, dtype)
+        return
+
+    reader = pd.read_csv(filepath, usecols=columns, dtype=_column_dtypes(columns, dtype),
+                         chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            yield tuple(chunk[col].to_numpy() for col in columns)
+
+def load_signal(filepath, columns=SIGNAL_COLUMNS, dtype=np.float64):
+    """Load signal data from a CSV or binary capture file.
+
+    Binary captures are fully read into the DataFrame, including a
+    generated time column. Analysis that does not need a DataFrame should
+    use load_recording, which keeps them memory-mapped.
+
+    Args:
+        filepath: Path to capture file containing the requested columns
+        columns: Columns to read (default: time, voltage, current)
+        dtype: Floating point dtype of the signal columns (default: float64)
+
+    Returns:
+        pandas DataFrame with signal data
+    """
+    validate_columns(filepath, columns)
+
+    if capture.is_capture(filepath):
+        meta, data = capture.open_capture(filepath)
+        values = _capture_columns(meta, data, columns, 0, meta['n_samples'], dtype)
+        return pd.DataFrame(dict(zip(columns, values)), columns=columns)
+
+    return pd.read_csv(filepath, usecols=columns, dtype=_column_dtypes(columns, dtype))[columns]
+
+def load_recording(filepath, channels=('voltage', 'current'), dtype=None, default_fs=FS):
+    """Load channels of a capture into a SignalData container.
+
+    Binary captures carry fs and t0 in their header. With the default
+    dtype their channels keep the stored dtype and float32 channels stay
+    memory-mapped (zero-copy views of the file); an explicit dtype casts
+    them into memory. For CSV files fs is estimated from the median spacing
+    of the time column (if any), which is then discarded.
+
+    Args:
+        filepath: Path to CSV or binary capture file
+        channels: Channel columns to load (default: voltage, current)
+        dtype: Floating point dtype of the channels, or None for the
+            capture's native dtype (float64 for CSV files) (default: None)
+        default_fs: Sampling frequency used when the file has no time column
+
+    Returns:
+        SignalData with the requested channels
+    """
+    channels = list(channels)
+
+    if capture.is_capture(filepath):
+        validate_columns(filepath, channels)
+        meta, data = capture.open_capture(filepath)
+        values = _capture_columns(meta, data, channels, 0, meta['n_samples'], dtype)
+        return SignalData(dict(zip(channels, values)), meta['fs'], meta['t0'])
+
+    has_time = 'time' in read_columns(filepath)
+    df = load_signal(filepath, columns=(['time'] if has_time else []) + channels,
+                     dtype=np.float64 if dtype is None else dtype)
+    return SignalData.from_frame(df, default_fs)
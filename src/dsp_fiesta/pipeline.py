@@ -0,0 +1,230 @@
+import numpy as np
+import argparse
+import warnings
+from .analyze_thd import thd_from_spectrum
+from .detect_anomaly import detect_anomaly
+from .ingest import load_recording
+from .power_quality import power_features
+from .spectral import MAX_HARMONIC, channel_spectra, rfft_amplitudes
+
+# Constants
+STEPS = {
+    'filter': 'filtered',
+    'thd': 'harmonics',
+    'features': 'features',
+    'detect': 'verdict',
+}  # CLI step -> pipeline output it prints
+CUTOFF_MARGIN = 2  # Default cutoff as a multiple of the highest analyzed harmonic (<0.5% loss at 4th order)
+
+class Stage:
+    """One step of a Pipeline.
+
+    A stage names the values it reads and the values it produces; func is
+    called as func(pipeline, *inputs) and returns the outputs as a tuple,
+    or the single output itself.
+    """
+
+    def __init__(self, name, inputs, outputs, func):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.func = func
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, {self.inputs} -> {self.outputs})"
+
+def _filter_stage(pipeline, signals):
+    """Low-pass filter the stacked channels.
+
+    Channels pass through unchanged without a cutoff or with one at or
+    above Nyquist. A cutoff close to the analyzed harmonics attenuates
+    them and biases THD low, so it triggers a warning.
+    """
+    if pipeline.cutoff is None or pipeline.cutoff >= pipeline.fs / 2:
+        return signals
+    highest = pipeline.highest_harmonic * pipeline.fundamental_freq
+    if pipeline.cutoff < CUTOFF_MARGIN * highest:
+        warnings.warn(f"Filter cutoff {pipeline.cutoff:g} Hz attenuates harmonics up to {highest:g} Hz; "
+                      f"THD will read low (use at least {CUTOFF_MARGIN * highest:g} Hz)")
+    from .apply_filter import filter_channels
+    return filter_channels(signals, pipeline.fs, pipeline.cutoff)
+
+def _spectrum_stage(pipeline, filtered):
+    """One rfft per channel (of every window) along the last axis, stacked."""
+    return channel_spectra(filtered, pipeline.workers)
+
+def _amplitudes_stage(pipeline, filtered, spectrum):
+    """One-sided amplitude spectra of the shared spectrum."""
+    n = filtered[0].shape[-1]
+    return np.stack([rfft_amplitudes(channel, spectrum=channel_spectrum)[1][..., :n//2]
+                     for channel, channel_spectrum in zip(filtered, spectrum)])
+
+def _harmonics_stage(pipeline, filtered, amplitudes):
+    """Harmonic amplitudes and THD read from the amplitude spectra."""
+    thd, fund_freq, amps = thd_from_spectrum(amplitudes, pipeline.fs, filtered[0].shape[-1],
+                                             pipeline.fundamental_freq, pipeline.max_harmonic)
+    # Orders 1..max_harmonic sit at multiples of the measured fundamental
+    orders = np.arange(1, amps.shape[-1] + 1)
+    freqs = np.where(np.isnan(amps), np.nan, orders * fund_freq[..., None])
+
+    return {'thd': thd, 'fund_freq': fund_freq, 'freqs': freqs, 'amps': amps}
+
+def _features_stage(pipeline, filtered, spectrum, harmonics):
+    """IEEE 1459 features from the shared spectrum and THD of both channels."""
+    return power_features(filtered[0], filtered[1], pipeline.fs, pipeline.fundamental_freq, pipeline.max_harmonic,
+                          spectrum=spectrum, harmonics=(harmonics['thd'], harmonics['fund_freq']))
+
+def _verdict_stage(pipeline, features):
+    """Anomaly verdict (is_anomaly, reason) of the features."""
+    return detect_anomaly(features, thd_threshold=pipeline.thd_threshold)
+
+STAGES = (
+    Stage('filter', ['signals'], ['filtered'], _filter_stage),
+    Stage('spectrum', ['filtered'], ['spectrum'], _spectrum_stage),
+    Stage('amplitudes', ['filtered', 'spectrum'], ['amplitudes'], _amplitudes_stage),
+    Stage('harmonics', ['filtered', 'amplitudes'], ['harmonics'], _harmonics_stage),
+    Stage('features', ['filtered', 'spectrum', 'harmonics'], ['features'], _features_stage),
+    Stage('verdict', ['features'], ['verdict'], _verdict_stage),
+)  # Filter -> spectrum -> amplitudes -> harmonics -> features -> verdict
+
+class Pipeline:
+    """Dependency graph of analysis stages over one window of samples.
+
+    Every run resolves the stages needed for the requested outputs from
+    the values it is given, runs each of them once and shares its outputs
+    with every later consumer, so e.g. THD, the fundamental phasors and the
+    spectrum plot all read the same rfft.
+
+    Values available to the default stages (STAGES):
+    - signals: Raw (voltage, current) channels, either stacked with shape
+      (2, ..., n) or as a pair of arrays, which are never copied
+    - filtered: signals after the low-pass filter (unchanged if cutoff is None)
+    - spectrum: rfft of filtered along the last axis
+    - amplitudes: One-sided amplitude spectra, shape (2, ..., n // 2)
+    - harmonics: Dictionary of thd, fund_freq, and freqs/amps of harmonic
+      orders 1..max_harmonic, per channel
+    - features: power_quality.power_features of filtered
+    - verdict: (is_anomaly, reason) from detect_anomaly.detect_anomaly
+    """
+
+    def __init__(self, fs, fundamental_freq=50, max_harmonic=MAX_HARMONIC, cutoff=None, thd_threshold=5.0,
+                 workers=None, stages=STAGES):
+        """
+        Args:
+            fs: Sampling frequency in Hz
+            fundamental_freq: Fundamental frequency in Hz (default: 50)
+            max_harmonic: Highest harmonic order (default: 10)
+            cutoff: Filter cutoff frequency in Hz, or None to skip filtering;
+                keep it well above max_harmonic * fundamental_freq (see CUTOFF_MARGIN)
+            thd_threshold: Current THD threshold of the verdict in percent (default: 5.0)
+            workers: Number of threads for the FFT (default: None)
+            stages: Stages of the graph (default: STAGES)
+        """
+        self.fs = fs
+        self.fundamental_freq = fundamental_freq
+        self.max_harmonic = max_harmonic
+        self.cutoff = cutoff
+        self.thd_threshold = thd_threshold
+        self.workers = workers
+        # Highest harmonic order below Nyquist
+        self.highest_harmonic = min(max_harmonic, int(np.ceil(fs / 2 / fundamental_freq)) - 1)
+        self.producers = {}  # Output name -> stage computing it
+        for stage in stages:
+            self.add(stage)
+
+    def add(self, stage):
+        """Add a stage; each value may be produced by one stage only."""
+        for output in stage.outputs:
+            if output in self.producers:
+                raise ValueError(f"'{output}' is already produced by stage '{self.producers[output].name}'")
+        for output in stage.outputs:
+            self.producers[output] = stage
+
+    def plan(self, targets, given=()):
+        """Stages needed to compute targets from the given values, in execution order."""
+        order = []
+        visiting = set()
+        available = set(given)
+
+        def visit(name):
+            if name in available:
+                return
+            stage = self.producers.get(name)
+            if stage is None:
+                raise ValueError(f"No stage produces '{name}' and it was not given")
+            if stage.name in visiting:
+                raise ValueError(f"Stage '{stage.name}' depends on its own output '{name}'")
+            visiting.add(stage.name)
+            for dependency in stage.inputs:
+                visit(dependency)
+            visiting.discard(stage.name)
+            order.append(stage)
+            available.update(stage.outputs)
+
+        for target in targets:
+            visit(target)
+        return order
+
+    def run(self, targets, **values):
+        """Compute targets for one window (or one stack of windows).
+
+        Args:
+            targets: Names of the values to compute
+            **values: Known values, e.g. signals=(voltage, current);
+                stages whose outputs are all given are skipped
+
+        Returns:
+            Dictionary of the given values and everything computed
+        """
+        for stage in self.plan(targets, values):
+            outputs = stage.func(self, *(values[name] for name in stage.inputs))
+            if len(stage.outputs) == 1:
+                outputs = (outputs,)
+            values.update(zip(stage.outputs, outputs))
+        return values
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run several analysis steps on one capture loaded once')
+    parser.add_argument('filepath', type=str, help='Path to CSV or binary capture')
+    parser.add_argument('--steps', type=str, nargs='+', choices=STEPS, default=['thd', 'features', 'detect'],
+                        help='Steps to report, in order (default: thd features detect)')
+    parser.add_argument('--cutoff', type=float, default=None,
+                        help=f'Filter cutoff frequency in Hz (default: {CUTOFF_MARGIN} x the highest harmonic, '
+                             f'i.e. {CUTOFF_MARGIN * MAX_HARMONIC * 50:g} Hz at 50 Hz)')
+    parser.add_argument('--freq', type=float, default=50, help='Fundamental frequency (default: 50 Hz)')
+    parser.add_argument('--thd-threshold', type=float, default=5.0, help='THD threshold in percent (default: 5.0)')
+
+    args = parser.parse_args(argv)
+
+    # Loaded once for every step
+    recording = load_recording(args.filepath)
+    print(f"Loaded {args.filepath}: {len(recording)} samples at {recording.fs:.0f} Hz")
+
+    cutoff = None
+    if 'filter' in args.steps:
+        cutoff = args.cutoff if args.cutoff is not None else CUTOFF_MARGIN * MAX_HARMONIC * args.freq
+    pipeline = Pipeline(recording.fs, args.freq, cutoff=cutoff, thd_threshold=args.thd_threshold)
+    results = pipeline.run([STEPS[step] for step in args.steps],
+                           signals=(recording['voltage'], recording['current']))
+
+    for step in args.steps:
+        if step == 'filter':
+            if cutoff >= recording.fs / 2:
+                print(f"Not filtered: cutoff {cutoff:g} Hz is at or above Nyquist ({recording.fs / 2:g} Hz)")
+            else:
+                print(f"Filtered voltage, current (cutoff={cutoff:g} Hz)")
+        elif step == 'thd':
+            harmonics = results['harmonics']
+            for name, thd, amps in zip(('Voltage', 'Current'), harmonics['thd'], harmonics['amps']):
+                print(f"{name} THD: {thd:.2f}% (harmonics 2-{len(amps)}: "
+                      f"{', '.join(f'{a:.3f}' for a in amps[1:] if not np.isnan(a))})")
+        elif step == 'features':
+            print("Features:")
+            for name, value in results['features'].items():
+                print(f"  {name}: {float(value):.4f}")
+        elif step == 'detect':
+            is_anomaly, reason = results['verdict']
+            print(f"Verdict: {'🔴 ANOMALY DETECTED: ' if is_anomaly else '🟢 NORMAL: '}{reason}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import numpy as np
+from .analyze_thd import THD_BACKENDS, calculate_thd_dft, calculate_thd_synchronous, thd_from_spectrum
+from .spectral import MAX_HARMONIC, bin_width, channel_spectra, dft_phasors, rfft_amplitudes
+
+# Constants
+FEATURE_NAMES = ('v_rms', 'i_rms', 'real_power', 'reactive_power', 'apparent_power', 'distortion_power',
+                 'power_factor', 'displacement_pf', 'crest_factor_v', 'crest_factor_i', 'thd_voltage',
+                 'thd_current', 'fundamental_freq')  # Keys returned by power_features, in order
+
+def calculate_rms(signal):
+    """Calculate RMS value of a signal along its last axis.
+
+    RMS = sqrt(mean(signal²)), with the sum of squares taken as a single
+    einsum reduction, so no squared copy of the signal is allocated.
+
+    Args:
+        signal: Array of signal values, shape (..., n)
+
+    Returns:
+        RMS value(s), shape (...)
+    """
+    signal = np.asarray(signal)
+    return np.sqrt(np.einsum('...i,...i->...', signal, signal, dtype=np.float64) / signal.shape[-1])
+
+def _fundamental_phasors(voltage, current, fs, fund_freq, spectrum=None):
+    """Complex fundamental coefficients of both channels at the voltage's fundamental bin."""
+    n = voltage.shape[-1]
+    idx_fund = np.rint(fund_freq[0] / bin_width(n, fs)).astype(np.intp)
+    if spectrum is not None:
+        return np.take_along_axis(spectrum, idx_fund[None, ..., None], axis=-1)[..., 0]
+
+    # Targeted bins only: evaluate the union of fundamental bins over windows
+    bins = np.unique(idx_fund)
+    positions = np.searchsorted(bins, idx_fund)[..., None]
+    return np.stack([np.take_along_axis(dft_phasors(channel, bins), positions, axis=-1)[..., 0]
+                     for channel in (voltage, current)])
+
+def power_features(voltage, current, fs, fundamental_freq=50, max_harmonic=MAX_HARMONIC,
+                   thd_backend='fft', workers=None, spectrum=None, harmonics=None):
+    """IEEE 1459 power quantities of a window or a stack of windows.
+
+    Each channel is reduced and transformed where it lies, so memory-mapped
+    captures are never copied: RMS values and real power are einsum
+    reductions, and one rfft per channel gives the shared spectrum for THD
+    and the fundamental phasors.
+
+    The fundamental phasors give the fundamental active and reactive
+    power P1, Q1 (positive for inductive loads). Distortion power is the
+    part of the apparent power not explained by P and Q1,
+    D = sqrt(S² - P² - Q1²).
+
+    Args:
+        voltage: Voltage samples, shape (..., n)
+        current: Current samples, shape (..., n)
+        fs: Sampling frequency in Hz
+        fundamental_freq: Fundamental frequency in Hz (default: 50)
+        max_harmonic: Highest harmonic order for THD (default: 10)
+        thd_backend: 'fft' (full spectrum), 'dft' (harmonic bins only, see
+            analyze_thd.calculate_thd_dft) or 'sync' (cycle-locked windows,
+            see analyze_thd.calculate_thd_synchronous)
+        workers: Number of threads for the FFT (default: None)
+        spectrum: Precomputed rfft of voltage and current along the last
+            axis, stacked as (2, ..., n // 2 + 1), shared with other consumers
+            ('fft' and 'sync' backends)
+        harmonics: Precomputed (thd, fund_freq) of that spectrum, as returned
+            by analyze_thd.thd_from_spectrum ('fft' and 'sync' backends);
+            requires spectrum
+
+    Returns:
+        Dictionary of feature arrays with shape (...):
+        - v_rms, i_rms: RMS voltage and current
+        - real_power: Mean instantaneous power P (W)
+        - reactive_power: Fundamental reactive power Q1 (var)
+        - apparent_power: V_rms * I_rms (VA)
+        - distortion_power: D (VA)
+        - power_factor: P / S
+        - displacement_pf: cos of the fundamental phase angle, P1 / S1
+        - crest_factor_v, crest_factor_i: Peak / RMS
+        - thd_voltage, thd_current: THD in percent
+        - fundamental_freq: Measured voltage fundamental in Hz (interpolated
+          between bins with the 'sync' backend)
+    """
+    if thd_backend not in THD_BACKENDS:
+        raise ValueError(f"thd_backend must be one of {THD_BACKENDS}")
+    if harmonics is not None and spectrum is None:
+        raise ValueError("harmonics must come with the spectrum they were read from")
+
+    voltage = np.asarray(voltage)
+    current = np.asarray(current)
+    n = voltage.shape[-1]
+
+    # Time-domain reductions, one channel at a time
+    v_rms = calculate_rms(voltage)
+    i_rms = calculate_rms(current)
+    real_power = np.einsum('...i,...i->...', voltage, current, dtype=np.float64) / n
+    peak = np.stack([np.maximum(channel.max(axis=-1), -channel.min(axis=-1)) for channel in (voltage, current)])
+
+    # One spectrum for both channels, stacked after the transform
+    if thd_backend == 'dft':
+        thd, fund_freq = map(np.stack, zip(*(calculate_thd_dft(channel, fs, fundamental_freq, max_harmonic)[:2]
+                                              for channel in (voltage, current))))
+        fundamental = _fundamental_phasors(voltage, current, fs, fund_freq)
+    else:
+        if harmonics is None:
+            if spectrum is None:
+                spectrum = channel_spectra((voltage, current), workers)
+            thd, fund_freq = map(np.stack, zip(*(
+                thd_from_spectrum(rfft_amplitudes(channel, spectrum=channel_spectrum)[1], fs, n,
+                                  fundamental_freq, max_harmonic)[:2]
+                for channel, channel_spectrum in zip((voltage, current), spectrum))))
+        else:
+            thd, fund_freq = harmonics
+        fundamental = _fundamental_phasors(voltage, current, fs, fund_freq, spectrum)
+        if thd_backend == 'sync':
+            # Cycle-locked THD over every whole cycle of each window, both
+            # channels locked to the voltage fundamental; the phasors above
+            # stay on the shared spectrum
+            thd_v, fund_freq_v, _ = calculate_thd_synchronous(voltage, fs, fundamental_freq, max_harmonic,
+                                                              cycles=None, workers=workers)
+            thd_i, _, _ = calculate_thd_synchronous(current, fs, fundamental_freq, max_harmonic, cycles=None,
+                                                    workers=workers, fund_freq=fund_freq_v)
+            thd = np.stack([thd_v, thd_i])
+            fund_freq = np.stack([fund_freq_v, fund_freq_v])
+
+    # Fundamental complex power: V1 * conj(I1) with RMS phasors (2 / n² scaling)
+    fundamental_power = 2 * fundamental[0] * np.conj(fundamental[1]) / n**2
+    reactive_power = fundamental_power.imag
+    apparent_power = v_rms * i_rms
+    distortion_power = np.sqrt(np.maximum(apparent_power**2 - real_power**2 - reactive_power**2, 0))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        power_factor = real_power / apparent_power
+        displacement_pf = fundamental_power.real / np.abs(fundamental_power)
+        crest_factor_v, crest_factor_i = peak / np.stack([v_rms, i_rms])
+
+    return {
+        'v_rms': v_rms,
+        'i_rms': i_rms,
+        'real_power': real_power,
+        'reactive_power': reactive_power,
+        'apparent_power': apparent_power,
+        'distortion_power': distortion_power,
+        'power_factor': power_factor,
+        'displacement_pf': displacement_pf,
+        'crest_factor_v': crest_factor_v,
+        'crest_factor_i': crest_factor_i,
+        'thd_voltage': thd[0],
+        'thd_current': thd[1],
+        'fundamental_freq': fund_freq[0]
+    }
@@ -0,0 +1,293 @@
+import numpy as np
+import functools
+from fractions import Fraction
+from scipy import signal
+from .signal_data import SignalData
+from .spectral import MAX_HARMONIC
+
+# Constants
+ANALYSIS_MARGIN = 1.2  # Analysis rate relative to twice the highest harmonic
+STOPBAND_ATTENUATION = 80  # Anti-alias stopband attenuation (dB)
+MAX_DENOMINATOR = 1000  # Largest up/down factor for rational resampling
+MAX_STAGE_FACTOR = 10  # Largest decimation factor of a single stage
+
+def analysis_rate(fs, fundamental_freq=50, max_harmonic=MAX_HARMONIC, margin=ANALYSIS_MARGIN, n=None):
+    """Pick an integer decimation factor for harmonic analysis.
+
+    The analysis rate is the lowest fs / q that is still at least
+    2 * margin times the highest requested harmonic. For windowed analysis
+    pass the window length n: q then also divides n, so every decimated
+    window has exactly n / q samples and its FFT bins fall on the same
+    frequencies. Whole records are trimmed to a multiple of q instead
+    (see decimate_for_analysis), which keeps the full factor.
+
+    Args:
+        fs: Sampling frequency in Hz
+        fundamental_freq: Fundamental frequency in Hz (default: 50)
+        max_harmonic: Highest harmonic order to keep (default: 10)
+        margin: Headroom above the Nyquist rate of that harmonic (default: 1.2)
+        n: Optional analysis window length in samples that q must divide
+
+    Returns:
+        Tuple of (decimation factor, analysis rate in Hz); the factor is 1
+        when fs is already low enough
+    """
+    q = max(int(fs // (2 * margin * max_harmonic * fundamental_freq)), 1)
+    if n is not None:
+        while n % q:
+            q -= 1
+    return q, fs / q
+
+def resample_factors(fs, target_fs, max_denominator=MAX_DENOMINATOR):
+    """Rational (up, down) factors that take fs closest to target_fs."""
+    ratio = Fraction(target_fs / fs).limit_denominator(max_denominator)
+    return ratio.numerator, ratio.denominator
+
+@functools.lru_cache(maxsize=64)
+def _anti_alias_filter(up, down, passband):
+    # Frequencies are in cycles per sample at the upsampled rate fs * up
+    nyquist = 0.5 / max(up, down)
+    width = 2 * nyquist * (1 - passband)
+    numtaps, beta = signal.kaiserord(STOPBAND_ATTENUATION, 2 * width)
+    numtaps += 1 - numtaps % 2  # Odd length keeps the delay a whole number of samples
+    return signal.firwin(numtaps, nyquist, window=('kaiser', beta), fs=1.0)
+
+def anti_alias_filter(up, down, passband=1 / ANALYSIS_MARGIN):
+    """Kaiser-window FIR anti-alias filter for resampling by up / down.
+
+    The band up to passband times the output Nyquist frequency is kept flat;
+    everything that would alias into that band is attenuated by 80 dB.
+
+    Args:
+        up, down: Resampling factors
+        passband: Fraction of the output Nyquist band to keep (default: 1 / 1.2)
+
+    Returns:
+        Array of filter coefficients at the upsampled rate
+    """
+    # Copy the cached design so callers can never modify it
+    return _anti_alias_filter(int(up), int(down), round(float(passband), 6)).copy()
+
+def resample(data, up, down, passband=1 / ANALYSIS_MARGIN):
+    """Polyphase resampling by up / down along the last axis.
+
+    Args:
+        data: Signal array of shape (..., n_samples)
+        up, down: Resampling factors
+        passband: Fraction of the output Nyquist band to keep (default: 1 / 1.2)
+
+    Returns:
+        Resampled array with ceil(n_samples * up / down) samples
+    """
+    if up == down:
+        return np.asarray(data)
+    return signal.resample_poly(data, up, down, axis=-1, window=anti_alias_filter(up, down, passband))
+
+def decimation_stages(q, max_factor=MAX_STAGE_FACTOR):
+    """Split a decimation factor into stages, largest first.
+
+    Early stages only have to protect the final analysis band, so their
+    transition bands are wide and their filters short; a cascade is far
+    cheaper than one long filter for the full factor.
+
+    Args:
+        q: Total decimation factor
+        max_factor: Largest factor of a single stage (default: 10)
+
+    Returns:
+        List of stage factors whose product is q
+    """
+    primes = []
+    k = 2
+    while k * k <= q:
+        while q % k == 0:
+            primes.append(k)
+            q //= k
+        k += 1
+    if q > 1:
+        primes.append(q)
+
+    stages = []
+    for prime in sorted(primes, reverse=True):
+        if stages and stages[-1] * prime <= max_factor:
+            stages[-1] *= prime
+        else:
+            stages.append(prime)
+    return sorted(stages, reverse=True)
+
+def _stage_passbands(stages, passband):
+    """Band to keep at each stage, relative to that stage's output Nyquist."""
+    total = np.prod(stages)
+    return [passband * np.prod(stages[:k + 1]) / total for k in range(len(stages))]
+
+def decimate(data, q, passband=1 / ANALYSIS_MARGIN):
+    """Multi-stage polyphase decimation by an integer factor along the last axis.
+
+    Args:
+        data: Signal array of shape (..., n_samples)
+        q: Decimation factor
+        passband: Fraction of the output Nyquist band to keep (default: 1 / 1.2)
+
+    Returns:
+        Decimated array
+    """
+    stages = decimation_stages(q)
+    for stage, stage_passband in zip(stages, _stage_passbands(stages, passband)):
+        data = resample(data, 1, stage, stage_passband)
+    return np.asarray(data)
+
+def decimate_for_analysis(data, fs, fundamental_freq=50, max_harmonic=MAX_HARMONIC):
+    """Downsample a signal to the analysis rate for its harmonics.
+
+    The signal is trimmed to a whole number of decimation factors (fewer
+    than q samples are dropped from the end), so its spectrum keeps the
+    bin spacing fs / n of the trimmed full-rate signal.
+
+    Args:
+        data: Signal array of shape (..., n_samples)
+        fs: Sampling frequency in Hz
+        fundamental_freq: Fundamental frequency in Hz (default: 50)
+        max_harmonic: Highest harmonic order to keep (default: 10)
+
+    Returns:
+        Tuple of (decimated signal, analysis rate in Hz)
+    """
+    q, fs_analysis = analysis_rate(fs, fundamental_freq, max_harmonic)
+    data = np.asarray(data)
+    return decimate(data[..., :data.shape[-1] // q * q], q), fs_analysis
+
+def decimate_recording(recording, fundamental_freq=50, max_harmonic=MAX_HARMONIC, n=None):
+    """Downsample every channel of a SignalData to the analysis rate.
+
+    Args:
+        recording: SignalData container
+        fundamental_freq: Fundamental frequency in Hz (default: 50)
+        max_harmonic: Highest harmonic order to keep (default: 10)
+        n: Analysis window length (samples) the factor must divide, for
+            windowed analysis; without it the recording is trimmed to a
+            whole number of factors, as in decimate_for_analysis
+
+    Returns:
+        SignalData at the analysis rate with the same start time (the
+        recording itself if no decimation is needed)
+    """
+    q, fs_analysis = analysis_rate(recording.fs, fundamental_freq, max_harmonic, n=n)
+    if q == 1 or len(recording) == 0:
+        return recording
+
+    recording = recording.slice(0, len(recording) // q * q)
+    names = list(recording.channels)
+    decimated = decimate(np.vstack([recording[name] for name in names]), q)
+    return SignalData(dict(zip(names, decimated)), fs_analysis, recording.t0)
+
+class StreamingResampler:
+    """Polyphase resampler for a stream of chunks.
+
+    Only the input history covered by the filter is kept between chunks,
+    and the concatenated output equals resample() on the whole signal.
+    """
+
+    def __init__(self, up, down, passband=1 / ANALYSIS_MARGIN):
+        """
+        Args:
+            up, down: Resampling factors
+            passband: Fraction of the output Nyquist band to keep (default: 1 / 1.2)
+        """
+        self.up = up
+        self.down = down
+        self.buffer = None  # Input history, starts at a multiple of down
+        self.start = 0  # Input index of buffer[..., 0]
+        self.n_in = 0  # Input samples received
+        self.next_out = 0  # Next causal output index
+        if up == down:
+            return  # Pass-through, no filter needed
+
+        # Same delay alignment as resample_poly: pre-pad so the filter
+        # delay is a whole number of output samples, then drop them
+        taps = anti_alias_filter(up, down, passband) * up
+        half_len = (len(taps) - 1) // 2
+        n_pre_pad = down - half_len % down
+        self.taps = np.concatenate([np.zeros(n_pre_pad), taps])
+        self.skip = (half_len + n_pre_pad) // down
+
+    def _emit(self, buffer, stop):
+        """Causal outputs next_out .. stop-1 from buffer, minus the delay."""
+        first = self.start * self.up // self.down  # Output index of y[..., 0]
+        begin = max(self.next_out, self.skip)
+        self.next_out = max(stop, self.next_out)
+        if stop <= begin:
+            return np.zeros(buffer.shape[:-1] + (0,))
+
+        y = signal.upfirdn(self.taps, buffer, self.up, self.down, axis=-1)
+        return y[..., begin - first:stop - first]
+
+    def process(self, chunk):
+        """Resample the next chunk along its last axis.
+
+        Args:
+            chunk: Array of shape (..., n_samples)
+
+        Returns:
+            Output samples that are complete after this chunk
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        if self.up == self.down:
+            return chunk
+
+        self.buffer = chunk if self.buffer is None else np.concatenate([self.buffer, chunk], axis=-1)
+        self.n_in += chunk.shape[-1]
+
+        # Outputs that only depend on inputs received so far
+        stop = -(-self.n_in * self.up // self.down)
+        out = self._emit(self.buffer, stop)
+
+        # Keep the inputs still needed by the next output
+        needed = -(-(self.next_out * self.down - len(self.taps) + 1) // self.up)
+        new_start = max(needed, 0) // self.down * self.down
+        if new_start > self.start:
+            self.buffer = self.buffer[..., new_start - self.start:]
+            self.start = new_start
+        return out
+
+    def flush(self):
+        """Return the final output samples (from the zero-padded tail) and reset."""
+        if self.buffer is None:
+            return np.zeros(0)
+
+        # Zeros after the end, exactly as upfirdn pads the full convolution
+        padding = np.zeros(self.buffer.shape[:-1] + (len(self.taps) // self.up + 2,))
+        n_out = -(-self.n_in * self.up // self.down)
+        out = self._emit(np.concatenate([self.buffer, padding], axis=-1), self.skip + n_out)
+
+        self.buffer = None
+        self.start = self.n_in = self.next_out = 0
+        return out
+
+class StreamingDecimator:
+    """Multi-stage decimation of a stream of chunks (see decimate)."""
+
+    def __init__(self, q, passband=1 / ANALYSIS_MARGIN):
+        """
+        Args:
+            q: Decimation factor
+            passband: Fraction of the output Nyquist band to keep (default: 1 / 1.2)
+        """
+        stages = decimation_stages(q)
+        self.stages = [StreamingResampler(1, stage, stage_passband)
+                       for stage, stage_passband in zip(stages, _stage_passbands(stages, passband))]
+
+    def process(self, chunk):
+        """Decimate the next chunk; returns the output samples completed by it."""
+        for stage in self.stages:
+            chunk = stage.process(chunk)
+        return chunk
+
+    def flush(self):
+        """Return the final output samples and reset."""
+        out = None
+        for stage in self.stages:
+            if out is not None:
+                out = np.concatenate([stage.process(out), stage.flush()], axis=-1)
+            else:
+                out = stage.flush()
+        return np.zeros(0) if out is None else out
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import warnings
+
+# Constants
+FS = 1000  # Fallback sampling frequency (Hz) when no time axis is available
+SPACING_TOLERANCE = 1e-3  # Allowed relative deviation of the sample spacing
+
+def estimate_sampling_frequency(time, default=FS, tolerance=SPACING_TOLERANCE):
+    """Estimate the sampling frequency from a time axis.
+
+    Uses the median spacing over the whole series, so a single bad
+    timestamp cannot skew the result. Warns if the spacing is not uniform.
+
+    Args:
+        time: Array of sample times in seconds
+        default: Value returned when fs cannot be determined (default: 1000 Hz)
+        tolerance: Allowed relative deviation of the spacing (default: 1e-3)
+
+    Returns:
+        Sampling frequency in Hz
+    """
+    time = np.asarray(time)
+    if len(time) < 2:
+        return default
+
+    dt = np.diff(time)
+    median_dt = np.median(dt)
+    if not median_dt > 0:
+        return default
+
+    irregular = np.count_nonzero(np.abs(dt - median_dt) > tolerance * median_dt)
+    if irregular:
+        warnings.warn(f"Non-uniform sampling: {irregular} of {len(dt)} intervals deviate from "
+                      f"the median spacing ({median_dt:.6g} s) by more than {tolerance:.0e}")
+
+    return 1 / median_dt
+
+class SignalData:
+    """Uniformly sampled channels with an implicit time axis.
+
+    Only fs, the start time t0 and the channel arrays are stored; sample
+    times are generated on demand, so no time column is kept in memory.
+    """
+
+    def __init__(self, channels, fs, t0=0.0):
+        """
+        Args:
+            channels: Mapping of channel name to 1-D array (all the same length)
+            fs: Sampling frequency in Hz
+            t0: Time of the first sample in seconds
+        """
+        self.channels = dict(channels)
+        self.fs = fs
+        self.t0 = t0
+
+        lengths = {len(values) for values in self.channels.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Channels must have equal length, found {sorted(lengths)}")
+        self.n_samples = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_frame(cls, df, default_fs=FS):
+        """Build from a DataFrame, estimating fs from its 'time' column if present."""
+        channels = {col: df[col].values for col in df.columns if col != 'time'}
+        if 'time' in df.columns and len(df) > 0:
+            return cls(channels, estimate_sampling_frequency(df['time'].values, default_fs),
+                       t0=df['time'].iloc[0])
+        return cls(channels, default_fs)
+
+    def __len__(self):
+        return self.n_samples
+
+    def __getitem__(self, name):
+        return self.channels[name]
+
+    def __contains__(self, name):
+        return name in self.channels
+
+    @property
+    def duration(self):
+        """Length of the recording in seconds."""
+        return self.n_samples / self.fs
+
+    @property
+    def time(self):
+        """Sample times in seconds, generated on each access."""
+        return self.time_at(0, self.n_samples)
+
+    def time_at(self, start, stop):
+        """Sample times for the index range [start, stop)."""
+        return self.t0 + np.arange(start, stop) / self.fs
+
+    def slice(self, start, stop):
+        """Samples [start, stop) as a new SignalData sharing the channel arrays."""
+        start, stop, _ = slice(start, stop).indices(self.n_samples)
+        channels = {name: values[start:stop] for name, values in self.channels.items()}
+        return SignalData(channels, self.fs, self.t0 + start / self.fs)
+
+    def time_range(self, start, end):
+        """Samples with start <= t <= end (seconds)."""
+        # Small slack so that boundaries landing exactly on a sample are kept
+        first = int(np.ceil((start - self.t0) * self.fs - 1e-9))
+        last = int(np.floor((end - self.t0) * self.fs + 1e-9))
+        return self.slice(max(first, 0), max(last + 1, 0))
+
+    def to_frame(self):
+        """Materialize as a DataFrame with a time column (e.g. for plotting)."""
+        return pd.DataFrame({'time': self.time, **self.channels})
@@ -0,0 +1,399 @@
+import numpy as np
+import functools
+from numpy.lib.stride_tricks import sliding_window_view
+from .spectral import MAX_HARMONIC
+
+# Constants
+BATCH_WINDOWS = 64  # Windows buffered before they are handed out as one batch
+REANCHOR_WINDOWS = 16  # Window lengths between exact recomputations of tracked state
+
+class WindowBuffer:
+    """Overlap buffer that turns a stream of sample chunks into sliding windows.
+
+    Samples are copied into a fixed, preallocated buffer; whenever it holds
+    complete windows they are handed out as one zero-copy batch and the
+    overlapping tail is moved to the front. Memory stays bounded by
+    window_len + batch_windows * hop samples per channel, no matter how
+    large the chunks or the recording are.
+    """
+
+    def __init__(self, window_len, hop, n_channels=2, batch_windows=BATCH_WINDOWS, dtype=np.float64):
+        if window_len < 1 or hop < 1:
+            raise ValueError("window_len and hop must be at least 1 sample")
+
+        self.window_len = window_len
+        self.hop = hop
+        self.buffer = np.empty((n_channels, window_len + batch_windows * hop), dtype=dtype)
+        self.fill = 0  # Valid samples currently in the buffer
+        self.offset = 0  # Absolute index of buffer[:, 0] in the stream
+        self.skip = 0  # Samples to drop before the next window (hop > window_len)
+
+    def push(self, *channels):
+        """Append one chunk per channel and yield the windows it completes.
+
+        Args:
+            *channels: One 1-D array per channel, all of the same length
+
+        Yields:
+            Tuple of (starts, windows): absolute start sample of each window
+            and a (n_channels, n_windows, window_len) view into the buffer.
+            The view is only valid until the generator is resumed.
+        """
+        n = len(channels[0])
+        pos = 0
+        while pos < n:
+            if self.skip:
+                dropped = min(self.skip, n - pos)
+                pos += dropped
+                self.skip -= dropped
+                self.offset += dropped
+                continue
+
+            take = min(self.buffer.shape[1] - self.fill, n - pos)
+            for row, data in zip(self.buffer, channels):
+                row[self.fill:self.fill + take] = data[pos:pos + take]
+            self.fill += take
+            pos += take
+
+            if self.fill == self.buffer.shape[1]:
+                yield self._windows()
+                self._compact()
+
+        if self.fill >= self.window_len:
+            yield self._windows()
+            self._compact()
+
+    def _n_windows(self):
+        """Number of complete windows currently held in the buffer."""
+        return (self.fill - self.window_len) // self.hop + 1
+
+    def _windows(self):
+        """Starts and zero-copy views of every complete window."""
+        n_windows = self._n_windows()
+        windows = sliding_window_view(self.buffer[:, :self.fill], self.window_len, axis=-1)
+        starts = self.offset + np.arange(n_windows) * self.hop
+        return starts, windows[:, :n_windows * self.hop:self.hop]
+
+    def _compact(self):
+        """Drop the windows just handed out and move the overlapping tail to the front."""
+        consumed = self._n_windows() * self.hop
+        keep = self.fill - consumed
+        if keep > 0:
+            self.buffer[:, :keep] = self.buffer[:, consumed:self.fill]
+            self.offset += consumed
+            self.fill = keep
+        else:
+            # Next window starts beyond the buffered samples
+            self.skip = -keep
+            self.offset += self.fill
+            self.fill = 0
+
+class SlidingDFT:
+    """Recursive sliding DFT of selected bins over the last window_len samples.
+
+    Every new sample updates each tracked bin with one complex multiply-add,
+    X_k <- w_k * (X_k + x[n] - x[n - N]) with w_k = exp(2j * pi * k / N),
+    evaluated for a whole chunk at once with a cumulative sum. Rounding
+    errors of the recursion never decay, so the phasors are re-anchored to
+    an exact DFT of the window every reanchor samples.
+    """
+
+    def __init__(self, window_len, bins, n_channels=1, reanchor=None):
+        """
+        Args:
+            window_len: Window length N in samples
+            bins: Integer DFT bins to track
+            n_channels: Number of channels updated together (default: 1)
+            reanchor: Samples between exact recomputations (default: 16 windows)
+        """
+        self.window_len = window_len
+        self.bins = np.asarray(bins, dtype=np.intp)
+        self.reanchor = reanchor or REANCHOR_WINDOWS * window_len
+
+        # Exact DFT of the window, oldest sample first, for re-anchoring
+        self.basis = np.exp(-2j * np.pi * np.outer(np.arange(window_len), self.bins) / window_len)
+        self.reset(n_channels)
+
+    def reset(self, n_channels=None):
+        """Clear the window (filled with zeros) and the phasors."""
+        n_channels = n_channels or self.history.shape[0]
+        self.history = np.zeros((n_channels, self.window_len))  # Last N samples, oldest first
+        self.phasors = np.zeros((n_channels, len(self.bins)), dtype=complex)
+        self.since_anchor = 0
+
+    def _twiddles(self, exponents):
+        """exp(2j * pi * k * e / N) for every exponent e and bin k, reduced mod N."""
+        turns = np.outer(exponents, self.bins) % self.window_len
+        return np.exp(2j * np.pi * turns / self.window_len)
+
+    def update(self, chunk):
+        """Advance the window over a chunk of new samples.
+
+        Args:
+            chunk: Array of shape (n_channels, n_samples), or 1-D for one channel
+
+        Returns:
+            DFT phasors of the window ending at each new sample, shape
+            (n_channels, n_samples, n_bins); until window_len samples have
+            been seen, the window is padded with zeros
+        """
+        chunk = np.atleast_2d(np.asarray(chunk, dtype=float))
+        m = chunk.shape[-1]
+        if m == 0:
+            return np.zeros(chunk.shape + (len(self.bins),), dtype=complex)
+
+        window = np.concatenate([self.history, chunk], axis=-1)
+        delta = chunk - window[:, :m]  # x[n] - x[n - N]
+
+        # Closed form of the recursion: X_t = w^t (X_0 + sum_{s <= t} w^(1 - s) delta_s)
+        steps = np.arange(1, m + 1)
+        running = np.cumsum(delta[..., None] * self._twiddles(1 - steps), axis=1)
+        phasors = self._twiddles(steps) * (self.phasors[:, None, :] + running)
+
+        self.history = window[:, -self.window_len:]
+        self.phasors = phasors[:, -1]
+        self.since_anchor += m
+        if self.since_anchor >= self.reanchor:
+            self.phasors = self.history @ self.basis
+            self.since_anchor = 0
+        return phasors
+
+    def amplitudes(self, phasors=None):
+        """Amplitudes of the tracked bins, scaled like spectral.amplitude_spectrum."""
+        phasors = self.phasors if phasors is None else phasors
+        return np.abs(phasors) * (2.0 / self.window_len)
+
+class HarmonicTracker:
+    """Sample-rate THD, RMS and power of voltage and current over a sliding window.
+
+    Harmonic phasors come from a SlidingDFT of the bins at integer multiples
+    of the fundamental, and RMS/power from sliding sums of squares and
+    products, so each new sample costs O(max_harmonic). The window should
+    span a whole number of fundamental cycles (e.g. 0.2 s = 10 cycles at 50 Hz).
+    """
+
+    def __init__(self, fs, window_len, fundamental_freq=50, max_harmonic=MAX_HARMONIC, reanchor=None):
+        """
+        Args:
+            fs: Sampling frequency in Hz
+            window_len: Window length in samples
+            fundamental_freq: Fundamental frequency in Hz (default: 50)
+            max_harmonic: Highest harmonic order (default: 10)
+            reanchor: Samples between exact recomputations (default: 16 windows)
+        """
+        bins = np.rint(np.arange(1, max_harmonic + 1) * fundamental_freq * window_len / fs).astype(np.intp)
+        # Skip harmonics beyond Nyquist
+        self.dft = SlidingDFT(window_len, bins[bins < window_len // 2], n_channels=2, reanchor=reanchor)
+        self.fs = fs
+        self.window_len = window_len
+        self.sums = np.zeros(3)  # Window sums of v^2, i^2 and v * i
+
+    def reset(self):
+        """Clear the window."""
+        self.dft.reset()
+        self.sums = np.zeros(3)
+
+    def harmonics(self):
+        """Frequencies and amplitudes of the tracked harmonics in the current window.
+
+        These are the amplitudes the THD of the last update was computed from.
+
+        Returns:
+            Tuple of (frequencies in Hz, amplitudes of voltage and current with
+            shape (2, n_harmonics)); orders beyond Nyquist are left out
+        """
+        return self.dft.bins * self.fs / self.window_len, self.dft.amplitudes()
+
+    @staticmethod
+    def _products(samples):
+        """Squares of both channels and their product, shape (3, n_samples)."""
+        voltage, current = samples
+        return np.stack([voltage * voltage, current * current, voltage * current])
+
+    def update(self, voltage, current):
+        """Advance over new voltage and current samples.
+
+        Args:
+            voltage, current: 1-D arrays of new samples
+
+        Returns:
+            Dictionary of per-sample arrays: v_rms, i_rms, real_power,
+            apparent_power, thd_voltage and thd_current (percent)
+        """
+        chunk = np.vstack([voltage, current]).astype(float)
+        m = chunk.shape[-1]
+
+        # Sliding sums from the samples entering and leaving the window
+        leaving = np.concatenate([self.dft.history, chunk], axis=-1)[:, :m]
+        sums = self.sums[:, None] + np.cumsum(self._products(chunk) - self._products(leaving), axis=1)
+
+        phasors = self.dft.update(chunk)
+        self.sums = sums[:, -1] if m else self.sums
+        if m and self.dft.since_anchor == 0:
+            # Re-anchored together with the phasors
+            self.sums = self._products(self.dft.history).sum(axis=1)
+
+        mean = np.maximum(sums / self.window_len, 0)
+        amplitudes = self.dft.amplitudes(phasors)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            thd = np.sqrt(np.sum(amplitudes[..., 1:]**2, axis=-1)) / amplitudes[..., 0] * 100
+
+        v_rms = np.sqrt(mean[0])
+        i_rms = np.sqrt(mean[1])
+        return {
+            'v_rms': v_rms,
+            'i_rms': i_rms,
+            'real_power': sums[2] / self.window_len,
+            'apparent_power': v_rms * i_rms,
+            'thd_voltage': thd[0],
+            'thd_current': thd[1]
+        }
+
+def _power_sums(voltage, current, weights=None):
+    """Sums of v^2, i^2 and v * i (optionally weighted) without temporaries."""
+    if weights is None:
+        return np.array([np.einsum('i,i->', x, y, dtype=np.float64)
+                         for x, y in ((voltage, voltage), (current, current), (voltage, current))])
+    return np.array([np.einsum('i,i,i->', weights, x, y, dtype=np.float64)
+                     for x, y in ((voltage, voltage), (current, current), (voltage, current))])
+
+class PowerAccumulator:
+    """Running RMS and real power over every sample pushed so far.
+
+    Keeps only the sums of v^2, i^2 and v * i and a sample count, so an
+    update costs O(1) per sample and allocates nothing per window. Chunk
+    sums are formed with einsum reductions and added with Neumaier
+    (compensated) summation, so long streams do not drift.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget all samples."""
+        self.count = 0
+        self.sums = np.zeros(3)  # v^2, i^2, v * i
+        self.compensation = np.zeros(3)
+
+    def _add(self, values):
+        """Compensated (Neumaier) addition of values to the running sums."""
+        total = self.sums + values
+        self.compensation += np.where(np.abs(self.sums) >= np.abs(values),
+                                      (self.sums - total) + values, (values - total) + self.sums)
+        self.sums = total
+
+    def update(self, voltage, current):
+        """Add a chunk of voltage and current samples (1-D arrays)."""
+        self._add(_power_sums(voltage, current))
+        self.count += len(voltage)
+
+    def _means(self):
+        """Mean of v^2, i^2 and v * i over the samples covered."""
+        return (self.sums + self.compensation) / max(self.count, 1)
+
+    @property
+    def v_rms(self):
+        return np.sqrt(max(self._means()[0], 0))
+
+    @property
+    def i_rms(self):
+        return np.sqrt(max(self._means()[1], 0))
+
+    @property
+    def real_power(self):
+        return self._means()[2]
+
+    @property
+    def apparent_power(self):
+        return self.v_rms * self.i_rms
+
+    def values(self):
+        """Current RMS and power readings as a dictionary."""
+        return {
+            'v_rms': self.v_rms,
+            'i_rms': self.i_rms,
+            'real_power': self.real_power,
+            'apparent_power': self.apparent_power
+        }
+
+class WindowedPowerAccumulator(PowerAccumulator):
+    """Running RMS and real power over the last window_len samples.
+
+    Samples are kept in a preallocated ring buffer; each update adds the
+    sums of the entering samples and subtracts those of the samples they
+    overwrite, so the cost per sample is O(1) regardless of the window.
+    """
+
+    def __init__(self, window_len):
+        if window_len < 1:
+            raise ValueError("window_len must be at least 1 sample")
+        self.window_len = window_len
+        self.ring = np.zeros((2, window_len))
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        self.ring[:] = 0
+        self.pos = 0  # Ring position of the oldest sample / next write
+
+    def update(self, voltage, current):
+        """Push a chunk of voltage and current samples (1-D arrays)."""
+        voltage = np.asarray(voltage)
+        current = np.asarray(current)
+        if len(voltage) >= self.window_len:
+            # The chunk replaces the whole window; start from exact sums
+            super().reset()
+            self.ring[0] = voltage[-self.window_len:]
+            self.ring[1] = current[-self.window_len:]
+            self.pos = 0
+            self.count = self.window_len
+            self._add(_power_sums(self.ring[0], self.ring[1]))
+            return
+
+        start = 0
+        while start < len(voltage):
+            # Contiguous run up to the end of the ring
+            stop = start + min(len(voltage) - start, self.window_len - self.pos)
+            ring = self.ring[:, self.pos:self.pos + stop - start]
+            self._add(-_power_sums(ring[0], ring[1]))
+            ring[0] = voltage[start:stop]
+            ring[1] = current[start:stop]
+            self._add(_power_sums(ring[0], ring[1]))
+            self.pos = (self.pos + stop - start) % self.window_len
+            start = stop
+        self.count = min(self.count + len(voltage), self.window_len)
+
+@functools.lru_cache(maxsize=8)
+def _ewma_weights(alpha, n):
+    # Weight of each sample of an n-sample chunk in the average at its end
+    weights = alpha * (1 - alpha) ** np.arange(n - 1, -1, -1)
+    weights.flags.writeable = False
+    return weights
+
+class EwmaPowerAccumulator(PowerAccumulator):
+    """Exponentially weighted RMS and real power.
+
+    Each sample's weight decays by (1 - alpha) per new sample; with
+    alpha = 1 / (time_constant * fs) this tracks like an RC meter. Early
+    readings are normalized by the total weight seen so far.
+    """
+
+    def __init__(self, alpha):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        super().__init__()
+
+    def update(self, voltage, current):
+        """Push a chunk of voltage and current samples (1-D arrays)."""
+        n = len(voltage)
+        decay = (1 - self.alpha) ** n
+        self.sums *= decay
+        self.compensation *= decay
+        self._add(_power_sums(voltage, current, _ewma_weights(self.alpha, n)))
+        self.count += n
+
+    def _means(self):
+        # Total weight after count samples is 1 - (1 - alpha)^count
+        weight = 1 - (1 - self.alpha) ** self.count
+        return (self.sums + self.compensation) / (weight if weight > 0 else 1)
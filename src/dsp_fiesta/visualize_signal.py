@@ -1,8 +1,8 @@
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import argparse
-import os
+from . import ingest
+from .signal_data import estimate_sampling_frequency
 
 # Constants
 FS = 1000  # Sampling frequency (Hz) - same as in generate_data.py
@@ -16,15 +16,7 @@ def load_signal(filepath):
     Returns:
         pandas DataFrame with signal data
     """
-    if not os.path.exists(filepath):
-        raise FileNotFoundError(f"File not found: {filepath}")
-    
-    df = pd.read_csv(filepath)
-    
-    # Validate required columns
-    required_cols = ['time', 'voltage', 'current']
-    if not all(col in df.columns for col in required_cols):
-        raise ValueError(f"CSV must contain columns: {required_cols}")
+    df = ingest.load_signal(filepath)
     
     # Validate minimum data size
     if len(df) < 2:
@@ -41,11 +33,7 @@ def calculate_sampling_frequency(df):
     Returns:
         Calculated sampling frequency in Hz
     """
-    if len(df) < 2:
-        return FS
-    
-    time_diff = df['time'].iloc[1] - df['time'].iloc[0]
-    return 1 / time_diff if time_diff > 0 else FS
+    return estimate_sampling_frequency(df['time'].values, FS)
 
 def plot_signal(df, title="Electrical Signal Waveform", show_fs=True):
     """Plot voltage and current signals in time domain.
@@ -84,7 +72,7 @@ def plot_signal(df, title="Electrical Signal Waveform", show_fs=True):
     plt.tight_layout()
     return fig
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description='Load and visualize electrical signal waveforms in time domain'
     )
@@ -113,7 +101,7 @@ def main():
         help='Time range to plot in seconds (e.g., --time-range 0 2)'
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Load signal data
     print(f"Loading signal data from: {args.filepath}")
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from dsp_fiesta.analyze_thd import (THD_DFT_TOLERANCE, calculate_groups, calculate_thd_batch, calculate_thd_dft,
+                                    calculate_thd_synchronous, main)
+from dsp_fiesta.generate_data import FS, generate_illegal_tap
+
+HARMONICS = {3: 0.15, 5: 0.12, 7: 0.05, 9: 0.03}  # Order -> amplitude relative to the fundamental
+TRUE_THD = np.sqrt(sum(a * a for a in HARMONICS.values())) * 100
+
+def _signal(fs, freq, duration=0.21):
+    t = np.arange(int(fs * duration)) / fs
+    signal = np.sin(2 * np.pi * freq * t + 0.3)
+    for h, amp in HARMONICS.items():
+        signal += amp * np.sin(2 * np.pi * h * freq * t + 0.3 * h + 0.7)
+    return signal
+
+def test_synchronous_thd_is_exact_for_cycle_locked_windows_at_low_rate():
+    fs = 1000
+    thd, fund_freq, harmonic_amps = calculate_thd_synchronous(_signal(fs, 50), fs)
+
+    assert fund_freq == pytest.approx(50, abs=1e-3)
+    assert thd == pytest.approx(TRUE_THD, abs=1e-3)
+    for h, amp in HARMONICS.items():
+        assert harmonic_amps[h - 1] == pytest.approx(amp, rel=1e-3)
+    # Not less accurate than the FFT backend on bin-centred harmonics
+    fft_thd = calculate_thd_batch(_signal(fs, 50)[:200], fs)[0]
+    assert abs(thd - TRUE_THD) <= abs(fft_thd - TRUE_THD) + 1e-3
+
+@pytest.mark.parametrize('fs', [1000, 1250, 2000])
+@pytest.mark.parametrize('freq', [49.5, 49.9, 50.2])
+def test_synchronous_thd_tracks_drifting_fundamental_at_low_rates(fs, freq):
+    thd, fund_freq, harmonic_amps = calculate_thd_synchronous(_signal(fs, freq), fs)
+
+    assert fund_freq == pytest.approx(freq, abs=0.01)
+    assert thd == pytest.approx(TRUE_THD, abs=0.1)
+    assert harmonic_amps[6] == pytest.approx(HARMONICS[7], rel=0.01)
+
+def test_synchronous_thd_batch_matches_single_windows():
+    fs = 2000
+    windows = np.stack([_signal(fs, freq) for freq in (49.7, 50.0, 50.3)])
+    thd, _, _ = calculate_thd_synchronous(windows.reshape(1, 3, -1), fs)
+
+    assert thd.shape == (1, 3)
+    for k, window in enumerate(windows):
+        assert thd[0, k] == pytest.approx(calculate_thd_synchronous(window, fs)[0], abs=1e-9)
+
+def _drifting_windows(fs, n_windows=200, window=0.2, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(fs * window)) / fs
+    freq = 50 + rng.uniform(-0.5, 0.5, size=(n_windows, 1))
+    windows = np.sin(2 * np.pi * freq * t + rng.uniform(0, 2 * np.pi, size=(n_windows, 1)))
+    for h in range(2, 11):
+        windows += rng.uniform(0.02, 0.1, size=(n_windows, 1)) * np.sin(2 * np.pi * h * freq * t + h)
+    return windows + rng.normal(scale=0.01, size=windows.shape)
+
+def test_dft_thd_matches_fft_on_illegal_tap():
+    np.random.seed(0)
+    current = generate_illegal_tap()['current'].to_numpy()
+
+    # Whole record, where leakage from the tap step shifts the fundamental
+    # peak off-centre, and 200 ms windows straddling the step
+    for signal in (current, current.reshape(-1, FS // 5)):
+        thd, fund_freq, harmonic_amps = calculate_thd_dft(signal, FS)
+        fft_thd, fft_fund_freq, fft_harmonic_amps = calculate_thd_batch(signal, FS)
+        np.testing.assert_allclose(thd, fft_thd, atol=THD_DFT_TOLERANCE)
+        np.testing.assert_array_equal(fund_freq, fft_fund_freq)
+        np.testing.assert_allclose(harmonic_amps, fft_harmonic_amps, rtol=1e-9)
+
+@pytest.mark.parametrize('fs', [1000, 1250, 10000])
+def test_dft_thd_matches_fft_on_drifting_windows(fs):
+    windows = _drifting_windows(fs)
+    thd, _, _ = calculate_thd_dft(windows, fs)
+
+    np.testing.assert_allclose(thd, calculate_thd_batch(windows, fs)[0], atol=THD_DFT_TOLERANCE)
+
+def test_synchronous_thd_of_a_window_does_not_depend_on_the_batch():
+    fs = 2000
+    good = _signal(fs, 49.8)
+    noise = np.random.default_rng(1).normal(scale=0.01, size=good.shape)
+    thd, fund_freq, _ = calculate_thd_synchronous(np.stack([noise, good]), fs, cycles=None)
+
+    alone = calculate_thd_synchronous(good, fs, cycles=None)
+    assert thd[1] == pytest.approx(alone[0], abs=1e-9)
+    assert fund_freq[1] == pytest.approx(alone[1], abs=1e-9)
+    assert thd[1] == pytest.approx(TRUE_THD, abs=0.1)
+
+def test_synchronous_thd_locks_to_a_given_fundamental():
+    fs = 2000
+    current = _signal(fs, 49.8)
+    # Fundamental measured on the voltage of the same window
+    _, voltage_freq, _ = calculate_thd_synchronous(np.sin(2 * np.pi * 49.8 * np.arange(len(current)) / fs), fs)
+    thd, fund_freq, _ = calculate_thd_synchronous(current, fs, fund_freq=voltage_freq)
+
+    assert fund_freq == voltage_freq
+    assert thd == pytest.approx(TRUE_THD, abs=0.1)
+
+@pytest.mark.parametrize('freq', [50, 60])
+def test_groups_are_computed_per_grouping_window(freq):
+    fs = 3000
+    t = np.arange(int(fs * 1.1)) / fs  # Five windows and a partial one
+    amp = np.where(t < 0.4, 1.0, 2.0)  # Level steps between windows
+    signal = amp * np.sin(2 * np.pi * freq * t) + 0.1 * amp * np.sin(2 * np.pi * 3 * freq * t)
+    groups = calculate_groups(signal, fs, freq)
+
+    assert groups.shape == (5, 4, 11)
+    np.testing.assert_allclose(groups[:, 0, 1], [1, 1, 2, 2, 2], rtol=1e-9)
+    np.testing.assert_allclose(groups[:, 0, 3], [0.1, 0.1, 0.2, 0.2, 0.2], rtol=1e-9)
+
+@pytest.mark.parametrize('fs, duration', [(1024, 1.0), (1000, 0.15)])
+def test_groups_cli_rejects_windows_that_do_not_fit(tmp_path, capsys, fs, duration):
+    t = np.arange(int(fs * duration)) / fs
+    path = tmp_path / 'capture.csv'
+    np.savetxt(path, np.column_stack([t, np.sin(2 * np.pi * 50 * t)]), delimiter=',', header='time,current',
+               comments='')
+
+    with pytest.raises(SystemExit) as exc:
+        main([str(path), '--groups'])
+    assert exc.value.code == 2
+    assert '--groups' in capsys.readouterr().err
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import signal
+from dsp_fiesta import apply_filter
+from dsp_fiesta.apply_filter import design_fir
+
+def _gain(taps, freq, fs):
+    return np.abs(signal.freqz(taps, worN=[freq], fs=fs)[1][0])
+
+@pytest.mark.parametrize('method', ['window', 'ls'])
+def test_design_fir_handles_low_cutoffs(method):
+    taps = design_fir(5, 1000, 255, method=method)
+
+    assert len(taps) == 255
+    assert _gain(taps, 0.5, 1000) == pytest.approx(1, abs=0.1)
+    assert _gain(taps, 50, 1000) < 0.01
+
+def test_design_fir_rejects_transition_band_beyond_the_spectrum():
+    with pytest.raises(ValueError, match="does not fit"):
+        design_fir(5, 1000, 255, method='ls', transition_width=20)
+    with pytest.raises(ValueError, match="Nyquist"):
+        design_fir(600, 1000, 255, method='ls')
+
+def test_least_squares_fir_is_reachable_from_the_cli(tmp_path, monkeypatch):
+    fs = 1000
+    t = np.arange(2000) / fs
+    path = tmp_path / 'signal.csv'
+    output = tmp_path / 'filtered.csv'
+    data = np.column_stack([t, np.sin(2 * np.pi * 50 * t), np.sin(2 * np.pi * 50 * t) + np.sin(2 * np.pi * 400 * t)])
+    np.savetxt(path, data, delimiter=',', header='time,voltage,current', comments='')
+
+    designs = []
+    original = apply_filter.design_fir
+    monkeypatch.setattr(apply_filter, 'design_fir', lambda *args: designs.append(args) or original(*args))
+    apply_filter.main([str(path), '--mode', 'fir', '--fir-method', 'ls', '--cutoff', '100', '--plot', 'none',
+                       '--output', str(output)])
+
+    assert designs and designs[0][3] == 'ls'
+    filtered = np.genfromtxt(output, delimiter=',', names=True)['current_filtered']
+    # 400 Hz removed, 50 Hz kept away from the edges
+    np.testing.assert_allclose(filtered[300:-300], np.sin(2 * np.pi * 50 * t[300:-300]), atol=0.01)
+
+def test_filter_signal_keeps_unfiltered_columns():
+    fs = 1000
+    t = np.arange(2000) / fs
+    df = pd.DataFrame({'time': t, 'voltage': np.sin(2 * np.pi * 50 * t), 'label': 'site-a',
+                       'current': np.cos(2 * np.pi * 50 * t)})
+    result = apply_filter.filter_signal(df, cutoff_freq=200)
+
+    assert list(result.columns) == ['time', 'voltage', 'current', 'label', 'voltage_filtered', 'current_filtered']
+    assert (result['label'] == 'site-a').all()
+    np.testing.assert_array_equal(result['current'], df['current'])
+    np.testing.assert_allclose(result['voltage_filtered'],
+                               apply_filter.filter_signal(df[['voltage']].to_numpy().T, fs=fs)[0])
+
+def _noisy_capture(tmp_path, fs=1000, n=5000):
+    rng = np.random.default_rng(0)
+    t = np.arange(n) / fs
+    data = np.column_stack([t, np.sin(2 * np.pi * 50 * t) + rng.normal(scale=0.2, size=n),
+                            np.sin(2 * np.pi * 50 * t - 0.5) + rng.normal(scale=0.2, size=n)])
+    path = tmp_path / 'capture.csv'
+    np.savetxt(path, data, delimiter=',', header='time,voltage,current', comments='', fmt='%.17g')
+    return str(path), pd.DataFrame(data, columns=['time', 'voltage', 'current'])
+
+def _chunks(data, sizes):
+    return np.split(data, np.cumsum(sizes), axis=-1)
+
+def test_streaming_filter_is_bit_identical_to_one_pass():
+    sos = apply_filter.design_lowpass_sos(100, 1000)
+    data = np.random.default_rng(1).normal(size=(2, 5000))
+
+    chunked = apply_filter.StreamingFilter(sos)
+    out = np.concatenate([chunked.process(chunk) for chunk in _chunks(data, [1, 999, 2000, 7])], axis=-1)
+
+    np.testing.assert_array_equal(out, signal.sosfilt(sos, data, axis=-1))
+
+def test_zero_phase_blocks_match_one_pass():
+    sos = apply_filter.design_lowpass_sos(100, 1000)
+    data = np.random.default_rng(2).normal(size=(2, 5000))
+
+    out = np.concatenate(list(apply_filter.zero_phase_blocks(sos, _chunks(data, [700] * 7))), axis=-1)
+
+    np.testing.assert_allclose(out, signal.sosfiltfilt(sos, data, axis=-1), atol=1e-10)
+
+@pytest.mark.parametrize('mode', ['causal', 'zero-phase'])
+def test_chunked_filter_file_matches_one_pass(tmp_path, mode):
+    path, df = _noisy_capture(tmp_path)
+    output = tmp_path / 'filtered.csv'
+
+    n = apply_filter.filter_file(path, str(output), cutoff_freq=100, mode=mode, chunksize=700)
+
+    assert n == len(df)
+    # Same CSV parser as the chunked reader; the output is written exactly
+    expected = apply_filter.filter_signal(pd.read_csv(path), cutoff_freq=100, mode=mode)
+    result = pd.read_csv(output, float_precision='round_trip')
+    assert list(result.columns) == list(expected.columns)
+    if mode == 'causal':
+        np.testing.assert_array_equal(result.to_numpy(), expected.to_numpy())
+    else:
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), atol=1e-10)
+
+@pytest.mark.parametrize('sizes', [[5000], [700] * 7 + [100], [1, 126, 3, 4870]])  # Incl. chunks under the delay
+def test_fir_blocks_match_fir_filter(sizes):
+    taps = design_fir(100, 1000)
+    data = np.random.default_rng(3).normal(size=(2, 5000))
+
+    out = np.concatenate(list(apply_filter.fir_blocks(taps, _chunks(data, sizes[:-1]))), axis=-1)
+
+    np.testing.assert_allclose(out, apply_filter.fir_filter(data, taps), atol=1e-12)
+
+def test_chunked_fir_filter_file_matches_one_pass(tmp_path):
+    path, _ = _noisy_capture(tmp_path)
+    output = tmp_path / 'filtered.csv'
+
+    apply_filter.filter_file(path, str(output), cutoff_freq=100, mode='fir', chunksize=700)
+
+    expected = apply_filter.filter_signal(pd.read_csv(path), cutoff_freq=100, mode='fir')
+    np.testing.assert_allclose(pd.read_csv(output, float_precision='round_trip').to_numpy(), expected.to_numpy(),
+                               atol=1e-12)
@@ -0,0 +1,50 @@
+import multiprocessing
+import os
+import numpy as np
+import pytest
+from dsp_fiesta import batch_analyze
+from dsp_fiesta.batch_analyze import analyze_batch
+
+_analyze_file = batch_analyze.analyze_file
+
+def _write_captures(tmp_path, count):
+    t = np.arange(1000) / 1000
+    data = np.column_stack([t, 230 * np.sin(2 * np.pi * 50 * t), 10 * np.sin(2 * np.pi * 50 * t)])
+    paths = []
+    for k in range(count):
+        path = str(tmp_path / f'capture_{k}.csv')
+        np.savetxt(path, data, delimiter=',', header='time,voltage,current', comments='')
+        paths.append(path)
+    return paths
+
+def _crash_on_bad_files(filepath, **options):
+    # Stands in for a file that kills its worker (segfault, OOM kill)
+    if 'crash' in os.path.basename(filepath):
+        os._exit(1)
+    return _analyze_file(filepath, **options)
+
+def test_failing_file_is_isolated_and_rows_keep_input_order(tmp_path):
+    paths = _write_captures(tmp_path, 5)
+    paths.insert(2, str(tmp_path / 'missing.csv'))
+
+    rows = list(analyze_batch(paths, workers=2, chunksize=2))
+
+    assert [row['file'] for row in rows] == paths
+    assert [row['status'] for row in rows] == ['ok', 'ok', 'error', 'ok', 'ok', 'ok']
+    assert rows[2]['error']
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason='workers only see the patched analyze_file when forked')
+def test_crashing_worker_is_isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_analyze, 'analyze_file', _crash_on_bad_files)
+    paths = _write_captures(tmp_path, 6)
+    crash = str(tmp_path / 'crash.csv')
+    os.link(paths[0], crash)
+    paths.insert(3, crash)
+
+    rows = list(analyze_batch(paths, workers=2, chunksize=2))
+
+    assert [row['file'] for row in rows] == paths
+    assert [row['status'] for row in rows].count('ok') == 6
+    assert rows[3]['status'] == 'error'
+    assert rows[3]['error'].startswith('BrokenProcessPool')
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from dsp_fiesta.convert_capture import convert
+from dsp_fiesta.ingest import load_recording
+
+def _write_csv(path, fs, n, t0=0.5):
+    t = t0 + np.arange(n) / fs
+    data = np.column_stack([t, 325 * np.sin(2 * np.pi * 50 * t), 7 * np.sin(2 * np.pi * 50 * t - 0.3)])
+    np.savetxt(path, data, delimiter=',', header='time,voltage,current', comments='', fmt='%.9f')
+    return data
+
+@pytest.mark.parametrize('chunk_mb', [64, 0.01])  # One byte range, and many split mid-file
+def test_convert_keeps_every_row_and_infers_fs(tmp_path, chunk_mb):
+    fs, n = 2500, 5003
+    data = _write_csv(tmp_path / 'capture.csv', fs, n)
+    out_path = str(tmp_path / 'capture.dspcap')
+
+    info = convert(str(tmp_path / 'capture.csv'), out_path, workers=2, chunk_mb=chunk_mb)
+
+    assert info['n_samples'] == n
+    assert info['fs'] == pytest.approx(fs, rel=1e-6)
+    assert info['t0'] == pytest.approx(0.5)
+    recording = load_recording(out_path)
+    assert len(recording) == n
+    assert recording.fs == pytest.approx(fs, rel=1e-6)
+    np.testing.assert_allclose(recording['voltage'], data[:, 1], rtol=1e-6, atol=1e-4)
+    np.testing.assert_allclose(recording['current'], data[:, 2], rtol=1e-6, atol=1e-5)
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from dsp_fiesta.cycles import cycle_metrics, zero_crossings
+
+@pytest.mark.parametrize('fs', [1000, 3200])
+@pytest.mark.parametrize('freq', [49.7, 50.0, 60.3])
+def test_cycle_metrics_of_a_known_sine(fs, freq):
+    phase = 0.3
+    t = np.arange(fs) / fs
+    voltage = 325 * np.sin(2 * np.pi * freq * t + phase)
+    current = 10 * np.sin(2 * np.pi * freq * t + phase - 0.5)
+
+    metrics = cycle_metrics(voltage, current, fs, fundamental_freq=round(freq / 10) * 10)
+
+    # Rising crossings where the phase reaches 2 * pi * k, before the last sample
+    k = np.arange(1, int((2 * np.pi * freq + phase) / (2 * np.pi)) + 1)
+    expected_crossings = (2 * np.pi * k - phase) / (2 * np.pi * freq) * fs
+    expected_crossings = expected_crossings[expected_crossings < fs - 1]
+    np.testing.assert_allclose(zero_crossings(voltage, fs, freq), expected_crossings, atol=5e-3)
+    assert len(metrics['start']) == len(expected_crossings) - 1
+    # Within 20 mHz, and 0.1% (class A) from about 16 samples per cycle
+    np.testing.assert_allclose(metrics['frequency'], freq, atol=0.02)
+    np.testing.assert_allclose(metrics['v_rms'], 325 / np.sqrt(2), rtol=1e-3)
+    np.testing.assert_allclose(metrics['i_rms'], 10 / np.sqrt(2), rtol=1e-3)
+    np.testing.assert_allclose(metrics['real_power'], 325 * 10 / 2 * np.cos(0.5), rtol=1e-3)
+
+def test_cycle_metrics_without_a_full_cycle_are_empty():
+    t = np.arange(15) / 1000
+    metrics = cycle_metrics(np.sin(2 * np.pi * 50 * t), np.sin(2 * np.pi * 50 * t), 1000)
+
+    assert all(len(values) == 0 for values in metrics.values())
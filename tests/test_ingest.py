@@ -0,0 +1,34 @@
+import mmap
+import numpy as np
+from dsp_fiesta import capture
+from dsp_fiesta.ingest import load_recording
+
+def _write(tmp_path, dtype='float32'):
+    t = np.arange(2000) / 1000
+    data = {'voltage': 325 * np.sin(2 * np.pi * 50 * t), 'current': 7 * np.sin(2 * np.pi * 50 * t - 0.3)}
+    path = str(tmp_path / f'capture_{dtype}.dspcap')
+    capture.write_capture(path, data, 1000, dtype=dtype)
+    return path, data
+
+def _is_mapped(values):
+    """Whether values is a view of a memory-mapped file (np.memmap or a slice of one)."""
+    while isinstance(values, np.ndarray):
+        values = values.base
+    return isinstance(values, mmap.mmap)
+
+def test_load_recording_keeps_float32_capture_mapped(tmp_path):
+    path, data = _write(tmp_path)
+    recording = load_recording(path)
+
+    assert recording.fs == 1000
+    for name in ('voltage', 'current'):
+        assert recording[name].dtype == np.float32
+        assert _is_mapped(recording[name])
+        np.testing.assert_allclose(recording[name], data[name], rtol=1e-6, atol=1e-4)
+
+def test_load_recording_casts_only_on_request(tmp_path):
+    path, data = _write(tmp_path)
+    recording = load_recording(path, dtype=np.float64)
+
+    assert recording['voltage'].dtype == np.float64
+    assert not _is_mapped(recording['voltage'])
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from dsp_fiesta.pipeline import Pipeline
+from dsp_fiesta.power_quality import power_features
+from dsp_fiesta.spectral import channel_spectra
+
+def _channels(fs=1000, n=2000):
+    t = np.arange(n) / fs
+    voltage = 325 * np.sin(2 * np.pi * 50 * t)
+    current = 7 * np.sin(2 * np.pi * 50 * t - 0.3) + 0.7 * np.sin(2 * np.pi * 150 * t)
+    return voltage, current
+
+def test_channel_spectra_matches_stacked_rfft():
+    voltage, current = _channels()
+    spectra = channel_spectra((voltage, current.astype(np.float32)))
+
+    assert spectra.dtype == np.complex128
+    np.testing.assert_allclose(spectra, np.fft.rfft(np.stack([voltage, current]), axis=-1), atol=1e-3)
+
+@pytest.mark.parametrize('thd_backend', ['fft', 'dft', 'sync'])
+def test_power_features_of_window_stacks_match_single_windows(thd_backend):
+    voltage, current = _channels()
+    batch = power_features(voltage.reshape(10, 200), current.reshape(10, 200), 1000, thd_backend=thd_backend)
+    single = power_features(voltage[:200], current[:200], 1000, thd_backend=thd_backend)
+
+    for name, value in single.items():
+        assert batch[name][0] == pytest.approx(value, rel=1e-9, abs=1e-9)
+    assert single['thd_current'] == pytest.approx(10, abs=1e-6)
+
+def test_pipeline_takes_unstacked_channels():
+    voltage, current = _channels()
+    pipeline = Pipeline(1000)
+    pair = pipeline.run(['features'], signals=(voltage, current))['features']
+    stacked = pipeline.run(['features'], signals=np.stack([voltage, current]))['features']
+
+    for name, value in stacked.items():
+        assert pair[name] == pytest.approx(value, rel=1e-12)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from dsp_fiesta.analyze_thd import calculate_thd
+from dsp_fiesta.resample import (StreamingDecimator, StreamingResampler, analysis_rate, decimate, decimate_for_analysis,
+                                  decimate_recording, resample)
+from dsp_fiesta.signal_data import SignalData
+
+def _harmonic_signal(fs, n):
+    t = np.arange(n) / fs
+    return np.sin(2 * np.pi * 50 * t) + 0.2 * np.sin(2 * np.pi * 150 * t) + 0.1 * np.sin(2 * np.pi * 250 * t)
+
+@pytest.mark.parametrize('fs, n', [(10000, 100001), (50000, 500001)])
+def test_decimation_keeps_full_factor_for_odd_length_records(fs, n):
+    q, fs_analysis = analysis_rate(fs)
+    signal = _harmonic_signal(fs, n)
+    decimated, rate = decimate_for_analysis(signal, fs)
+
+    assert q > 1 and n % q
+    assert rate == fs_analysis
+    assert len(decimated) == n // q
+
+    recording = decimate_recording(SignalData({'current': signal}, fs, t0=1.0))
+    assert recording.fs == fs_analysis
+    assert recording.t0 == 1.0
+    np.testing.assert_array_equal(recording['current'], decimated)
+
+def test_decimated_thd_is_accurate_for_odd_length_record():
+    fs, n = 10000, 100001
+    thd, _, _ = calculate_thd(_harmonic_signal(fs, n), fs, decimate=True)
+
+    assert thd == pytest.approx(np.hypot(0.2, 0.1) * 100, abs=0.01)
+
+def test_windowed_factor_divides_the_window():
+    q, fs_analysis = analysis_rate(10000, n=1999)
+    assert 1999 % q == 0
+    assert fs_analysis == 10000 / q
+
+@pytest.mark.parametrize('q', [10, 40, 50])
+@pytest.mark.parametrize('sizes', [[20003], [1, 7, 4000, 13, 9999, 5983]])
+def test_streaming_decimator_matches_decimate(q, sizes):
+    data = np.random.default_rng(q).normal(size=(2, sum(sizes)))
+    chunks = np.split(data, np.cumsum(sizes)[:-1], axis=-1)
+
+    decimator = StreamingDecimator(q)
+    out = np.concatenate([decimator.process(chunk) for chunk in chunks] + [decimator.flush()], axis=-1)
+
+    np.testing.assert_allclose(out, decimate(data, q), atol=1e-12)
+
+def test_streaming_resampler_matches_resample():
+    data = np.random.default_rng(0).normal(size=10007)
+    chunks = np.split(data, [3, 1000, 1001, 6000])
+
+    resampler = StreamingResampler(5, 12)
+    out = np.concatenate([resampler.process(chunk) for chunk in chunks] + [resampler.flush()])
+
+    np.testing.assert_allclose(out, resample(data, 5, 12), atol=1e-12)
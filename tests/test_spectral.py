@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from dsp_fiesta.spectral import group_spectrum
+
+FS = 1000
+
+def test_group_weights_on_a_flat_spectrum():
+    # 10 cycles at 50 Hz: 5 Hz bins, harmonic h on bin 10 * h
+    groups = group_spectrum(np.ones(101), FS, 200)
+    harmonic, subgroup, interharmonic, centred = groups
+
+    # Root-sum-square of the (weighted) bin counts: 9 full bins and two half-weight edges
+    np.testing.assert_allclose(harmonic[1:10], np.sqrt(10))
+    np.testing.assert_allclose(subgroup[1:10], np.sqrt(3))
+    np.testing.assert_allclose(interharmonic[:10], 3)
+    np.testing.assert_allclose(centred[:10], np.sqrt(7))
+    # DC group: bins 0-4 and half of bin 5; subgroup: bins 0-1
+    assert harmonic[0] == pytest.approx(np.sqrt(5.5))
+    assert subgroup[0] == pytest.approx(np.sqrt(2))
+    # Order 10 (500 Hz) needs bins beyond Nyquist
+    assert np.isnan(groups[:, 10]).all()
+
+def test_group_edge_bin_is_split_between_neighbouring_harmonics():
+    amplitudes = np.zeros(101)
+    amplitudes[35] = 1.0  # 175 Hz, halfway between harmonics 3 and 4
+    harmonic, subgroup, interharmonic, centred = group_spectrum(amplitudes, FS, 200)
+
+    np.testing.assert_allclose(harmonic[[3, 4]], np.sqrt(0.5))
+    assert np.nansum(harmonic**2) == pytest.approx(1)
+    assert np.nansum(subgroup) == 0
+    assert interharmonic[3] == centred[3] == 1
+    assert np.nansum(interharmonic) == np.nansum(centred) == 1
+
+def test_group_of_an_odd_number_of_cycles_has_no_shared_bin():
+    # 5 cycles: 10 Hz bins, harmonic h on bin 5 * h
+    groups = group_spectrum(np.ones(51), FS, 100)
+
+    np.testing.assert_allclose(groups[0, 1:10], np.sqrt(5))
+    np.testing.assert_allclose(groups[2, :9], 2)
+
+def test_group_spectrum_rejects_windows_of_partial_cycles():
+    with pytest.raises(ValueError, match="whole number"):
+        group_spectrum(np.ones(103), FS, 205)
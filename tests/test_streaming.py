@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+from dsp_fiesta.streaming import (EwmaPowerAccumulator, HarmonicTracker, PowerAccumulator, SlidingDFT,
+                                   WindowedPowerAccumulator)
+
+FS = 1000
+WINDOW = 200  # 10 cycles at 50 Hz
+
+def _stream(n, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / FS
+    voltage = 325 * np.sin(2 * np.pi * 50.2 * t) + 10 * np.sin(2 * np.pi * 150.6 * t) + rng.normal(size=n)
+    current = 7 * np.sin(2 * np.pi * 50.2 * t - 0.4) + 1.5 * np.sin(2 * np.pi * 250 * t) + rng.normal(size=n)
+    return voltage, current
+
+def _chunks(n, sizes):
+    edges = np.cumsum(sizes)
+    return [slice(start, stop) for start, stop in zip(np.concatenate([[0], edges]), np.append(edges, n))]
+
+@pytest.mark.parametrize('reanchor', [None, 3 * WINDOW + 7])
+def test_sliding_dft_matches_direct_dft_of_each_window(reanchor):
+    n = 40 * WINDOW + 13  # Past several re-anchors
+    signal = np.vstack(_stream(n))
+    bins = np.array([10, 20, 30, 50])
+    dft = SlidingDFT(WINDOW, bins, n_channels=2, reanchor=reanchor)
+
+    phasors = np.concatenate([dft.update(signal[:, part]) for part in _chunks(n, [1, 150, 999, 3000, 77])],
+                             axis=1)
+
+    direct = np.fft.rfft(sliding_window_view(signal, WINDOW, axis=-1), axis=-1)[..., bins]
+    np.testing.assert_allclose(phasors[:, WINDOW - 1:], direct, atol=1e-7 * np.abs(direct).max())
+    # Right after a re-anchor the phasors are the exact DFT again
+    np.testing.assert_allclose(dft.phasors, direct[:, -1], atol=1e-7 * np.abs(direct).max())
+
+def test_sliding_dft_reanchors_to_the_exact_dft():
+    signal = np.vstack(_stream(16 * WINDOW))
+    dft = SlidingDFT(WINDOW, [10, 30], reanchor=16 * WINDOW)
+
+    dft.update(signal[:1])
+
+    assert dft.since_anchor == 0
+    np.testing.assert_array_equal(dft.phasors, signal[:1, -WINDOW:] @ dft.basis)
+
+def test_harmonic_tracker_matches_direct_window_metrics():
+    n = 20 * WINDOW
+    voltage, current = _stream(n)
+    tracker = HarmonicTracker(FS, WINDOW)
+
+    metrics = {}
+    for part in _chunks(n, [WINDOW - 1, 1, 1234, 50]):
+        for name, values in tracker.update(voltage[part], current[part]).items():
+            metrics.setdefault(name, []).append(values)
+    metrics = {name: np.concatenate(values)[WINDOW - 1:] for name, values in metrics.items()}
+
+    windows = sliding_window_view(np.vstack([voltage, current]), WINDOW, axis=-1)
+    amplitudes = np.abs(np.fft.rfft(windows, axis=-1)[..., 10:100:10]) * 2 / WINDOW  # Orders 1-9, below Nyquist
+    thd = np.sqrt(np.sum(amplitudes[..., 1:]**2, axis=-1)) / amplitudes[..., 0] * 100
+    np.testing.assert_allclose(metrics['thd_voltage'], thd[0], rtol=1e-9)
+    np.testing.assert_allclose(metrics['thd_current'], thd[1], rtol=1e-9)
+    np.testing.assert_allclose(metrics['v_rms'], np.sqrt(np.mean(windows[0]**2, axis=-1)), rtol=1e-9)
+    np.testing.assert_allclose(metrics['real_power'], np.mean(windows[0] * windows[1], axis=-1), rtol=1e-9)
+    np.testing.assert_allclose(tracker.harmonics()[1], amplitudes[:, -1], rtol=1e-9)
+
+def _offset_chunks(n_chunks=500, seed=1):
+    # Large offsets make naive running sums lose the small varying part
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1, 400, size=n_chunks)
+    return [(1e4 + rng.normal(size=size), -3e3 + rng.normal(size=size)) for size in sizes]
+
+def test_power_accumulator_matches_np_mean():
+    chunks = _offset_chunks()
+    accumulator = PowerAccumulator()
+    for voltage, current in chunks:
+        accumulator.update(voltage, current)
+
+    voltage, current = (np.concatenate(channel) for channel in zip(*chunks))
+    assert accumulator.count == len(voltage)
+    assert accumulator.v_rms == pytest.approx(np.sqrt(np.mean(voltage**2)), rel=1e-14)
+    assert accumulator.i_rms == pytest.approx(np.sqrt(np.mean(current**2)), rel=1e-14)
+    assert accumulator.real_power == pytest.approx(np.mean(voltage * current), rel=1e-14)
+
+def test_windowed_power_accumulator_matches_np_mean_of_the_window():
+    window_len = 1000
+    accumulator = WindowedPowerAccumulator(window_len)
+    chunks = _offset_chunks(200) + [(np.ones(1500), np.ones(1500))] + _offset_chunks(50, seed=2)
+    seen = []
+    for voltage, current in chunks:
+        accumulator.update(voltage, current)
+        seen.append((voltage, current))
+        voltage, current = (np.concatenate(channel)[-window_len:] for channel in zip(*seen))
+
+        assert accumulator.v_rms == pytest.approx(np.sqrt(np.mean(voltage**2)), rel=1e-12)
+        assert accumulator.real_power == pytest.approx(np.mean(voltage * current), rel=1e-12)
+
+def test_ewma_power_accumulator_matches_weighted_mean():
+    alpha = 1e-3
+    chunks = _offset_chunks(100)
+    accumulator = EwmaPowerAccumulator(alpha)
+    for voltage, current in chunks:
+        accumulator.update(voltage, current)
+
+    voltage, current = (np.concatenate(channel) for channel in zip(*chunks))
+    weights = alpha * (1 - alpha) ** np.arange(len(voltage) - 1, -1, -1)
+    assert accumulator.v_rms == pytest.approx(np.sqrt(np.average(voltage**2, weights=weights)), rel=1e-12)
+    assert accumulator.real_power == pytest.approx(np.average(voltage * current, weights=weights), rel=1e-12)